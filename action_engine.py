@@ -6,10 +6,16 @@ Actions are deterministic rules based on predicted issue type.
 Escalation is triggered by impact score or downtime thresholds.
 """
 
+import numpy as np
+import pandas as pd
+
 # ── Thresholds ────────────────────────────────────────────────────────────────
 ESCALATION_IMPACT_THRESHOLD   = 100_000   # ₹1 lakh
 ESCALATION_DOWNTIME_THRESHOLD = 120       # 2 hours
 
+# Pre-bound rupee formatter shared by the scalar and vectorised escalation paths
+_FMT_INR_0 = "{:,.0f}".format
+
 # ── Action Rules ─────────────────────────────────────────────────────────────
 ACTION_MAP = {
     "network_failure": {
@@ -45,68 +51,129 @@ FALLBACK_ACTION = {
     "team": "L1 Support",
 }
 
+# Flattened (action, sla_minutes, team) tuples — one hash lookup per incident
+_ACTION_TUPLES = {
+    k: (v["action"], v["sla_minutes"], v["team"]) for k, v in ACTION_MAP.items()
+}
+_FALLBACK_TUPLE = (
+    FALLBACK_ACTION["action"], FALLBACK_ACTION["sla_minutes"], FALLBACK_ACTION["team"]
+)
+
+# Column-wise lookup table for process_dataframe(): positions come from
+# _ISSUE_INDEX.get_indexer(), whose -1 for an unknown issue lands on the
+# fallback entry appended last to each column.
+_ISSUE_INDEX = pd.Index(list(_ACTION_TUPLES))
+_ACTION_COL, _SLA_COL, _TEAM_COL = (
+    np.array(col) for col in zip(*_ACTION_TUPLES.values(), _FALLBACK_TUPLE)
+)
+
 
 def get_recommended_action(predicted_issue: str) -> dict:
-    """Return action details for a predicted issue type."""
-    return ACTION_MAP.get(predicted_issue, FALLBACK_ACTION)
+    """
+    Return action details for a predicted issue type.
+    The dict is a fresh copy, so callers may modify it without touching ACTION_MAP.
+    """
+    return dict(ACTION_MAP.get(predicted_issue, FALLBACK_ACTION))
 
 
 def should_escalate(impact_score: float, downtime_minutes: float) -> bool:
     """Return True if incident meets escalation criteria."""
-    return (
+    return bool(
         impact_score >= ESCALATION_IMPACT_THRESHOLD
         or downtime_minutes >= ESCALATION_DOWNTIME_THRESHOLD
     )
 
 
+def escalation_mask(impact_score, downtime_minutes):
+    """Vectorised should_escalate() over Series/arrays — returns a boolean mask."""
+    return (
+        (impact_score >= ESCALATION_IMPACT_THRESHOLD)
+        | (downtime_minutes >= ESCALATION_DOWNTIME_THRESHOLD)
+    )
+
+
 def escalation_status(impact_score: float, downtime_minutes: float) -> str:
     """Return a human-readable escalation status string."""
-    if should_escalate(impact_score, downtime_minutes):
-        reasons = []
-        if impact_score >= ESCALATION_IMPACT_THRESHOLD:
-            reasons.append(f"Impact ₹{impact_score:,.0f} exceeds threshold")
-        if downtime_minutes >= ESCALATION_DOWNTIME_THRESHOLD:
-            reasons.append(f"Downtime {downtime_minutes}m exceeds threshold")
+    reasons = []
+    if impact_score >= ESCALATION_IMPACT_THRESHOLD:
+        reasons.append("Impact ₹" + _FMT_INR_0(impact_score) + " exceeds threshold")
+    if downtime_minutes >= ESCALATION_DOWNTIME_THRESHOLD:
+        reasons.append(f"Downtime {downtime_minutes}m exceeds threshold")
+    if reasons:
         return "🚨 ESCALATED — " + "; ".join(reasons)
     return "✅ Normal — Monitor"
 
 
-def process_incident(row: dict) -> dict:
+def enrich_incident_inplace(row: dict) -> None:
+    """
+    Add action + escalation fields directly onto a caller-owned incident dict.
+    Reads keys: predicted_issue, impact_score, downtime_minutes
+    """
+    try:
+        action, sla, team = _ACTION_TUPLES[row.get("predicted_issue", "unknown")]
+    except KeyError:
+        action, sla, team = _FALLBACK_TUPLE
+
+    row["recommended_action"] = action
+    row["sla_minutes"]        = sla
+    row["responsible_team"]   = team
+    row["escalation_status"]  = escalation_status(
+        row.get("impact_score", 0), row.get("downtime_minutes", 0)
+    )
+
+
+def process_incident(row: dict, copy: bool = True) -> dict:
     """
     Full pipeline for a single incident dict.
     Expects keys: atm_id, location, predicted_issue, impact_score, downtime_minutes
     Returns enriched dict with action + escalation fields.
-    """
-    predicted = row.get("predicted_issue", "unknown")
-    impact    = row.get("impact_score", 0)
-    downtime  = row.get("downtime_minutes", 0)
-
-    action_info = get_recommended_action(predicted)
 
-    return {
-        **row,
-        "recommended_action": action_info["action"],
-        "sla_minutes":        action_info["sla_minutes"],
-        "responsible_team":   action_info["team"],
-        "escalation_status":  escalation_status(impact, downtime),
-    }
+    copy=False enriches and returns the caller's dict itself, skipping the
+    per-incident dict copy on batch paths.
+    """
+    enriched = dict(row) if copy else row
+    enrich_incident_inplace(enriched)
+    return enriched
 
 
 def process_dataframe(df):
-    """Apply full action + escalation logic to a DataFrame."""
-    import pandas as pd
-    df = df.copy()
+    """
+    Apply full action + escalation logic to a DataFrame.
 
-    df["recommended_action"] = df["predicted_issue"].apply(
-        lambda x: get_recommended_action(x)["action"]
-    )
-    df["sla_minutes"] = df["predicted_issue"].apply(
-        lambda x: get_recommended_action(x)["sla_minutes"]
-    )
-    df["responsible_team"] = df["predicted_issue"].apply(
-        lambda x: get_recommended_action(x)["team"]
+    The input frame is never copied or mutated: the four new columns are built
+    on their own and concatenated onto it.
+    """
+    # One indexer pass over predicted_issue yields all three action columns
+    pos = _ISSUE_INDEX.get_indexer(df["predicted_issue"])
+
+    # Escalation: same rules as escalation_status(), evaluated column-wise
+    impact   = df["impact_score"]
+    downtime = df["downtime_minutes"]
+    imp_hit  = impact >= ESCALATION_IMPACT_THRESHOLD
+    dt_hit   = downtime >= ESCALATION_DOWNTIME_THRESHOLD
+
+    imp_str = "Impact ₹" + impact.map(_FMT_INR_0) + " exceeds threshold"
+    dt_str  = "Downtime " + downtime.astype(str) + "m exceeds threshold"
+    escalation = np.select(
+        [imp_hit & dt_hit, imp_hit, dt_hit],
+        [
+            "🚨 ESCALATED — " + imp_str + "; " + dt_str,
+            "🚨 ESCALATED — " + imp_str,
+            "🚨 ESCALATED — " + dt_str,
+        ],
+        default="✅ Normal — Monitor",
     )
-    df["escalation_status"] = df.apply(
-        lambda r: escalation_status(r["impact_score"], r["downtime_minutes"]), axis=1
+
+    new_cols = pd.DataFrame(
+        {
+            "recommended_action": _ACTION_COL[pos],
+            "sla_minutes":        _SLA_COL[pos],
+            "responsible_team":   _TEAM_COL[pos],
+            "escalation_status":  escalation,
+        },
+        index=df.index,
     )
-    return df
+    stale = df.columns.intersection(new_cols.columns)
+    if len(stale):
+        df = df.drop(columns=stale)
+    return pd.concat([df, new_cols], axis=1)
@@ -7,7 +7,15 @@ Run with:
 """
 
 import os
+import re
 import datetime
+import hashlib
+import html
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import NamedTuple
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -28,650 +36,70 @@ st.set_page_config(
 #  Palette  : deep navy base · ice-blue accent · amber/red/green status signals
 #  Type     : DM Mono (headers + data numerals) + DM Sans (body)
 #  Motif    : controlled density, glowing borders, Bloomberg-meets-security-ops
+#
+#  The stylesheet itself lives in styles.css next to this file.  If a bundled
+#  styles.min.css is present (see README — Lightning CSS build step) it is
+#  served as-is; otherwise styles.css is minified at startup.
 # ─────────────────────────────────────────────────────────────────────────────
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=DM+Mono:ital,wght@0,300;0,400;0,500;1,300&family=DM+Sans:wght@300;400;500;600;700&display=swap');
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   DESIGN TOKENS  —  refined fintech palette
-   ═══════════════════════════════════════════════════════════════════════════ */
-:root {
-  /* ── Surface hierarchy: 4 clearly-separated stops ── */
-  --bg-base:        #0B1220;   /* page canvas                          */
-  --bg-surface:     #0F172A;   /* sidebar, header card                 */
-  --bg-card:        #111827;   /* KPI cards, panel backgrounds         */
-  --bg-elevated:    #1F2937;   /* expander content, form fields        */
-  --bg-overlay:     #263347;   /* inline callout boxes                 */
-
-  /* ── Borders: two neutral stops, no blue tinting ── */
-  --border-subtle:  #2A3446;
-  --border-default: #374558;
-
-  /* ── Text ── */
-  --text-primary:   #F9FAFB;
-  --text-secondary: #9CA3AF;
-  --text-muted:     #6B7280;
-
-  /* ── Primary accent: one blue, used sparingly ── */
-  --primary:        #3B82F6;
-  --primary-dim:    rgba(59,130,246,0.10);
-  --primary-border: rgba(59,130,246,0.25);
-
-  /* ── Semantic status signals ── */
-  --success:        #22C55E;
-  --success-bg:     rgba(34,197,94,0.08);
-  --success-border: rgba(34,197,94,0.20);
-
-  --warning:        #F59E0B;
-  --warning-bg:     rgba(245,158,11,0.08);
-  --warning-border: rgba(245,158,11,0.20);
-
-  --danger:         #EF4444;
-  --danger-bg:      rgba(239,68,68,0.08);
-  --danger-border:  rgba(239,68,68,0.20);
-
-  /* ── Section-rule accent (gold) — only used in .pg-section-label::before ── */
-  --gold: #CA8A04;
-
-  /* ── Typography ── */
-  --font-mono: 'DM Mono', 'Courier New', monospace;
-  --font-sans: 'DM Sans', system-ui, sans-serif;
-
-  /* ── Geometry ── */
-  --radius-sm: 4px;
-  --radius-md: 8px;
-  --radius-lg: 12px;
-
-  /* ── Shadows: real depth, not glow ── */
-  --shadow-card:     0 1px 3px rgba(0,0,0,0.45), 0 1px 2px rgba(0,0,0,0.30);
-  --shadow-raised:   0 4px 8px rgba(0,0,0,0.55), 0 2px 4px rgba(0,0,0,0.35);
-}
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   GLOBAL
-   ═══════════════════════════════════════════════════════════════════════════ */
-html, body, [class*="css"] {
-  font-family: var(--font-sans) !important;
-  background-color: var(--bg-base) !important;
-  color: var(--text-primary);
-}
-.main .block-container {
-  padding: 1.25rem 2rem 3rem 2rem !important;
-  max-width: 1600px !important;
-}
-
-/* ── Typography scale ─────────────────────────────────────────────────────── */
-h1, h2, h3, h4, h5 {
-  font-family: var(--font-mono) !important;
-  letter-spacing: -0.02em;
-  color: var(--text-primary) !important;
-}
-h1 { font-size: 1.5rem  !important; font-weight: 500 !important; }
-h2 { font-size: 1.2rem  !important; font-weight: 400 !important; }
-h3 { font-size: 1.0rem  !important; font-weight: 400 !important; }
-h4 { font-size: 0.85rem !important; font-weight: 400 !important; }
-p  { font-size: 0.85rem; color: var(--text-secondary); }
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   SIDEBAR
-   ═══════════════════════════════════════════════════════════════════════════ */
-[data-testid="stSidebar"] {
-  background: var(--bg-surface) !important;
-  border-right: 1px solid var(--border-subtle) !important;
-}
-[data-testid="stSidebar"] > div:first-child { padding-top: 0.75rem; }
-[data-testid="stSidebar"] p,
-[data-testid="stSidebar"] label {
-  color: var(--text-secondary) !important;
-  font-size: 0.78rem !important;
-}
-[data-testid="stSidebar"] hr {
-  border-color: var(--border-subtle) !important;
-  margin: 0.85rem 0;
-}
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   KPI METRIC CARDS
-   Problems fixed: flat look, border blending into bg, no elevation.
-   Solution: bg-card (#111827) on bg-base (#0B1220) gives clear separation.
-             Real box-shadow creates depth. Accent bar is a narrow 32px strip
-             instead of a full-width gradient bleed.
-   ═══════════════════════════════════════════════════════════════════════════ */
-/* Remove blue focus/highlight from slider value popover */
-[data-baseweb="slider"] *:focus {
-  outline: none !important;
-  box-shadow: none !important;
-}
-
-/* Remove hover/focus blue highlight */
-[data-baseweb="slider"] *:hover {
-  box-shadow: none !important;
-}
-
-/* Style the tooltip bubble itself */
-[data-baseweb="tooltip"] {
-  background-color: var(--bg-raised) !important;
-  color: var(--text-primary) !important;
-  border: 1px solid var(--border-default) !important;
-  font-family: var(--font-mono) !important;
-  font-size: 0.7rem !important;
-}
-
-/* Remove blue background from tooltip arrow */
-[data-baseweb="tooltip"] > div {
-  background-color: var(--bg-raised) !important;
-}
-
-[data-testid="metric-container"] {
-  background: var(--bg-card) !important;
-  border: 1px solid var(--border-subtle) !important;
-  border-radius: var(--radius-md) !important;
-  padding: 1rem 1.25rem !important;
-  box-shadow: var(--shadow-card) !important;
-  position: relative;
-  overflow: hidden;
-  transition: box-shadow 0.18s ease, border-color 0.18s ease;
-}
-[data-testid="metric-container"]:hover {
-  box-shadow: var(--shadow-raised) !important;
-  border-color: var(--border-default) !important;
-}
-/* Narrow left-anchored accent bar — not a full-width glow */
-[data-testid="metric-container"]::before {
-  content: '';
-  position: absolute;
-  top: 0; left: 0;
-  width: 32px; height: 2px;
-  background: var(--primary);
-  opacity: 0.75;
-}
-[data-testid="metric-container"] label {
-  font-family: var(--font-mono) !important;
-  font-size: 0.62rem !important;
-  font-weight: 400 !important;
-  text-transform: uppercase;
-  letter-spacing: 0.1em;
-  color: var(--text-muted) !important;
-}
-[data-testid="stMetricValue"] {
-  font-family: var(--font-mono) !important;
-  font-size: 1.45rem !important;
-  font-weight: 500 !important;
-  color: var(--text-primary) !important;
-  line-height: 1.15;
-}
-[data-testid="stMetricDelta"] {
-  font-family: var(--font-mono) !important;
-  font-size: 0.65rem !important;
-}
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   TABS
-   ═══════════════════════════════════════════════════════════════════════════ */
-[data-testid="stTabs"] {
-  border-bottom: 1px solid var(--border-subtle);
-}
-button[data-baseweb="tab"] {
-  font-family: var(--font-mono) !important;
-  font-size: 0.7rem !important;
-  font-weight: 400 !important;
-  text-transform: uppercase;
-  letter-spacing: 0.09em;
-  color: var(--text-muted) !important;
-  background: transparent !important;
-  border: none !important;
-  padding: 0.7rem 1.1rem !important;
-  transition: color 0.12s ease;
-}
-button[data-baseweb="tab"]:hover {
-  color: var(--text-secondary) !important;
-}
-/* Active tab: white text + primary underline. No accent-ice bleed. */
-button[data-baseweb="tab"][aria-selected="true"] {
-  color: var(--text-primary) !important;
-  border-bottom: 2px solid var(--primary) !important;
-}
-[data-testid="stTabPanel"] { padding-top: 1.25rem; }
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   BUTTONS
-   ═══════════════════════════════════════════════════════════════════════════ */
-.stButton > button {
-  font-family: var(--font-mono) !important;
-  font-size: 0.72rem !important;
-  font-weight: 500 !important;
-  text-transform: uppercase;
-  letter-spacing: 0.07em;
-  border-radius: var(--radius-sm) !important;
-  border: 1px solid var(--border-default) !important;
-  background: var(--bg-card) !important;
-  color: var(--text-secondary) !important;
-  transition: all 0.13s ease;
-}
-.stButton > button:hover {
-  border-color: var(--primary) !important;
-  color: var(--text-primary) !important;
-  background: var(--primary-dim) !important;
-}
-.stButton > button[kind="primary"] {
-  background: var(--primary) !important;
-  border-color: var(--primary) !important;
-  color: #fff !important;
-}
-.stButton > button[kind="primary"]:hover {
-  background: #5b96f8 !important;
-  border-color: #5b96f8 !important;
-}
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   FORM INPUTS
-   ═══════════════════════════════════════════════════════════════════════════ */
-.stTextInput > div > div > input,
-.stNumberInput > div > div > input,
-.stSelectbox > div > div,
-.stTextArea > div > textarea {
-  font-family: var(--font-mono) !important;
-  font-size: 0.8rem !important;
-  background: var(--bg-elevated) !important;
-  border: 1px solid var(--border-subtle) !important;
-  border-radius: var(--radius-sm) !important;
-  color: var(--text-primary) !important;
-}
-.stSelectbox > div > div > div { color: var(--text-primary) !important; }
-
-/* ═══════════════════════════════════════════════════════════════════════════
-   SLIDER
-   Problem: a single overly-broad selector coloured every child div blue,
-            which made the whole widget look like selected/highlighted text.
-   Fix: target each BaseWeb sub-element individually.
-        Track (bg) = neutral border colour.
-        Fill (left of thumb) = --primary.
-        Thumb = --primary with a card-coloured inner ring (no text-select look).
-   ═══════════════════════════════════════════════════════════════════════════ */
-
-/* ── Slider ─────────────────────────────────────────────────────────────────
-   Single proven selector — paints the fill divs primary blue.
-   No extra rules: they cause rectangle artefacts. */
-[data-testid="stSlider"] > div > div > div { background: var(--primary) !important; }
-/* Hide only min/max labels (not tooltip value) */
-[data-testid="stSlider"] > div > div:last-child {
-  display: none !important;
-}
-[data-testid="stSlider"] p {
-  font-family: var(--font-mono) !important;
-  font-size: 0.65rem !important;
-  color: var(--text-muted) !important;
-}
+STYLESHEET_PATH     = Path(__file__).with_name("styles.css")
+STYLESHEET_MIN_PATH = Path(__file__).with_name("styles.min.css")
+
+# Web fonts are linked from the page rather than @import-ed by the stylesheet:
+# preconnect warms the TLS handshakes and preload starts the font CSS request
+# in parallel with stylesheet parsing instead of after it.
+FONTS_URL = (
+    "https://fonts.googleapis.com/css2?family=DM+Mono:ital,wght@0,300;0,400;0,500;1,300"
+    "&family=DM+Sans:wght@300;400;500;600;700&display=swap"
+)
+FONT_LINKS = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    f'<link rel="preload" as="style" href="{FONTS_URL}">'
+    f'<link rel="stylesheet" href="{FONTS_URL}">'
+)
 
-/* ═══════════════════════════════════════════════════════════════════════════
-   DATAFRAMES
-   ═══════════════════════════════════════════════════════════════════════════ */
-[data-testid="stDataFrame"] {
-  border: 1px solid var(--border-subtle) !important;
-  border-radius: var(--radius-md) !important;
-  overflow: hidden;
-  box-shadow: var(--shadow-card);
-}
-[data-testid="stDataFrame"] th {
-  background: var(--bg-elevated) !important;
-  color: var(--text-muted) !important;
-  text-transform: uppercase;
-  letter-spacing: 0.07em;
-  font-family: var(--font-mono) !important;
-  font-size: 0.62rem !important;
-  border-bottom: 1px solid var(--border-default) !important;
-}
-[data-testid="stDataFrame"] td {
-  font-family: var(--font-mono) !important;
-  font-size: 0.76rem !important;
-  border-color: var(--border-subtle) !important;
-}
 
-/* ═══════════════════════════════════════════════════════════════════════════
-   EXPANDERS
-   ═══════════════════════════════════════════════════════════════════════════ */
-[data-testid="stExpander"] {
-  background: var(--bg-card) !important;
-  border: 1px solid var(--border-subtle) !important;
-  border-radius: var(--radius-md) !important;
-  margin-bottom: 5px !important;
-  overflow: hidden;
-  box-shadow: var(--shadow-card);
-  transition: border-color 0.13s ease;
-}
-[data-testid="stExpander"]:hover {
-  border-color: var(--border-default) !important;
-}
-[data-testid="stExpander"] summary {
-  font-family: var(--font-mono) !important;
-  font-size: 0.76rem !important;
-  color: var(--text-secondary) !important;
-  padding: 0.55rem 0.85rem !important;
-}
-[data-testid="stExpanderDetails"] {
-  background: var(--bg-elevated) !important;
-  border-top: 1px solid var(--border-subtle) !important;
-  padding: 0.9rem !important;
-}
+# Comments, quoted strings and url(...) values — strings and urls pass through
+# the minifier untouched; comments are dropped.
+_CSS_VERBATIM = re.compile(
+    r"""/\*.*?\*/|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|url\([^)]*\)""", re.S | re.I
+)
 
-/* ═══════════════════════════════════════════════════════════════════════════
-   CODE BLOCKS
-   ═══════════════════════════════════════════════════════════════════════════ */
-.stCode > div, pre {
-  background: var(--bg-base) !important;
-  border: 1px solid var(--border-subtle) !important;
-  border-radius: var(--radius-sm) !important;
-  font-family: var(--font-mono) !important;
-  font-size: 0.72rem !important;
-  /* Slightly muted code colour — was pure #7eb8f7 (too blue) */
-  color: #93C5FD !important;
-}
 
-/* ═══════════════════════════════════════════════════════════════════════════
-   MISC STREAMLIT WIDGETS
-   ═══════════════════════════════════════════════════════════════════════════ */
-hr {
-  border-color: var(--border-subtle) !important;
-  margin: 1.25rem 0 !important;
-}
-.stCaption, [data-testid="stCaptionContainer"] {
-  font-family: var(--font-mono) !important;
-  font-size: 0.66rem !important;
-  color: var(--text-muted) !important;
-  letter-spacing: 0.04em;
-}
-[data-testid="stRadio"] label {
-  font-family: var(--font-mono) !important;
-  font-size: 0.76rem !important;
-  color: var(--text-secondary) !important;
-}
-[data-testid="stSpinner"] > div {
-  border-top-color: var(--primary) !important;
-}
+def _collapse_css(css: str) -> str:
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", css)
 
-/* ═══════════════════════════════════════════════════════════════════════════
-   CUSTOM COMPONENT CLASSES  (all colour references migrated to new tokens)
-   ═══════════════════════════════════════════════════════════════════════════ */
-
-/* ── Header bar ────────────────────────────────────────────────────────────── */
-.pg-header {
-  display: flex;
-  align-items: center;
-  justify-content: space-between;
-  padding: 1.1rem 1.5rem;
-  background: var(--bg-surface);
-  border: 1px solid var(--border-subtle);
-  border-radius: var(--radius-lg);
-  margin-bottom: 1.25rem;
-  position: relative;
-  overflow: hidden;
-  box-shadow: var(--shadow-card);
-}
-/* Single-colour accent rule — primary blue only, no gold bleed */
-.pg-header::after {
-  content: '';
-  position: absolute;
-  top: 0; left: 0; right: 0; height: 1px;
-  background: linear-gradient(
-    90deg,
-    transparent 0%,
-    var(--primary) 30%,
-    rgba(59,130,246,0.3) 65%,
-    transparent 100%
-  );
-  opacity: 0.55;
-}
-.pg-logo {
-  font-family: var(--font-mono);
-  font-size: 1.3rem;
-  font-weight: 500;
-  color: var(--text-primary);
-  letter-spacing: -0.03em;
-}
-.pg-logo span { color: var(--primary); }
-.pg-tagline {
-  font-family: var(--font-mono);
-  font-size: 0.64rem;
-  color: var(--text-muted);
-  text-transform: uppercase;
-  letter-spacing: 0.12em;
-  margin-top: 3px;
-}
-.pg-header-right {
-  text-align: right;
-  display: flex;
-  flex-direction: column;
-  gap: 4px;
-  align-items: flex-end;
-}
-.pg-live-dot {
-  display: inline-block;
-  width: 7px; height: 7px;
-  border-radius: 50%;
-  background: var(--success);
-  /* Dimmer glow — was too intense */
-  box-shadow: 0 0 5px rgba(34,197,94,0.5);
-  margin-right: 5px;
-  animation: blink 2.4s infinite;
-}
-@keyframes blink { 0%,100%{opacity:1} 50%{opacity:0.3} }
-.pg-timestamp {
-  font-family: var(--font-mono);
-  font-size: 0.68rem;
-  color: var(--text-muted);
-}
-/* Model badge: neutral surface, no blue background */
-.pg-model-badge {
-  font-family: var(--font-mono);
-  font-size: 0.62rem;
-  color: var(--text-secondary);
-  background: var(--bg-elevated);
-  border: 1px solid var(--border-default);
-  border-radius: 3px;
-  padding: 2px 8px;
-  letter-spacing: 0.05em;
-}
 
-/* ── Section label ─────────────────────────────────────────────────────────── */
-.pg-section-label {
-  display: flex;
-  align-items: center;
-  gap: 0.5rem;
-  font-family: var(--font-mono);
-  font-size: 0.62rem;
-  font-weight: 500;
-  text-transform: uppercase;
-  letter-spacing: 0.13em;
-  color: var(--text-muted);
-  border-bottom: 1px solid var(--border-subtle);
-  padding-bottom: 0.4rem;
-  margin: 1.5rem 0 0.9rem 0;
-}
-.pg-section-label::before {
-  content: '';
-  display: block;
-  width: 3px; height: 11px;
-  background: var(--gold);
-  border-radius: 2px;
-  flex-shrink: 0;
-}
+def _minify_css(css: str) -> str:
+    """
+    Strip comments and collapse whitespace — roughly halves the payload.
+    Quoted strings and url(...) values are kept byte-for-byte.
+    """
+    out, plain, pos = [], [], 0
+    for m in _CSS_VERBATIM.finditer(css):
+        plain.append(css[pos:m.start()])
+        pos = m.end()
+        token = m.group()
+        if token.startswith("/*"):
+            continue
+        out.append(_collapse_css("".join(plain)))
+        out.append(token)
+        plain = []
+    plain.append(css[pos:])
+    out.append(_collapse_css("".join(plain)))
+    return "".join(out).strip()
 
-/* ── Mode panel header ─────────────────────────────────────────────────────── */
-.pg-mode-header {
-  display: flex;
-  align-items: center;
-  gap: 0.7rem;
-  padding: 0.7rem 1rem;
-  border-radius: var(--radius-md);
-  margin: 0.75rem 0;
-  font-family: var(--font-mono);
-  font-size: 0.75rem;
-  letter-spacing: 0.03em;
-}
-.pg-mode-header.red {
-  background: var(--danger-bg);
-  border: 1px solid var(--danger-border);
-  color: var(--danger);
-}
-.pg-mode-header.amber {
-  background: var(--warning-bg);
-  border: 1px solid var(--warning-border);
-  color: var(--warning);
-}
-.pg-mode-header.green {
-  background: var(--success-bg);
-  border: 1px solid var(--success-border);
-  color: var(--success);
-}
-.pg-mode-count  { font-size: 1.0rem; font-weight: 500; margin-left: auto; }
-.pg-mode-impact { font-size: 0.67rem; opacity: 0.72; }
-
-/* ── Incident detail grid ──────────────────────────────────────────────────── */
-.pg-detail-grid {
-  display: grid;
-  grid-template-columns: 1fr 1fr;
-  gap: 0.45rem 1.25rem;
-  margin-bottom: 0.65rem;
-}
-.pg-detail-row {
-  font-family: var(--font-mono);
-  font-size: 0.73rem;
-  display: flex;
-  gap: 0.4rem;
-  align-items: baseline;
-}
-.pg-detail-key {
-  color: var(--text-muted);
-  font-size: 0.6rem;
-  text-transform: uppercase;
-  letter-spacing: 0.07em;
-  white-space: nowrap;
-  flex-shrink: 0;
-}
-.pg-detail-val { color: var(--text-primary); }
-
-/* ── Confidence pills ──────────────────────────────────────────────────────── */
-.conf-pill {
-  font-family: var(--font-mono);
-  font-size: 0.63rem;
-  padding: 1px 6px;
-  border-radius: 3px;
-  display: inline-block;
-}
-.conf-high { color: var(--success); background: var(--success-bg); border: 1px solid var(--success-border); }
-.conf-med  { color: var(--warning); background: var(--warning-bg); border: 1px solid var(--warning-border); }
-.conf-low  { color: var(--danger);  background: var(--danger-bg);  border: 1px solid var(--danger-border);  }
-
-/* ── Action box ────────────────────────────────────────────────────────────── */
-/* Was: accent-ice text on blue-tinted bg = blue overload.
-   Now: primary text on elevated surface with a left rule. */
-.pg-action-box {
-  background: var(--bg-elevated);
-  border: 1px solid var(--border-default);
-  border-left: 3px solid var(--primary);
-  border-radius: var(--radius-sm);
-  padding: 0.55rem 0.8rem;
-  font-family: var(--font-mono);
-  font-size: 0.72rem;
-  color: var(--text-primary);
-  line-height: 1.5;
-  margin-top: 0.5rem;
-}
 
-/* ── Sidebar branding ──────────────────────────────────────────────────────── */
-.pg-sidebar-logo {
-  font-family: var(--font-mono);
-  font-size: 0.95rem;
-  font-weight: 500;
-  color: var(--text-primary);
-  letter-spacing: -0.02em;
-  padding: 0.35rem 0 0.2rem 0;
-}
-.pg-sidebar-logo span { color: var(--primary); }
-.pg-sidebar-tagline {
-  font-family: var(--font-mono);
-  font-size: 0.58rem;
-  color: var(--text-muted);
-  text-transform: uppercase;
-  letter-spacing: 0.11em;
-  margin-bottom: 0.4rem;
-}
-.pg-sidebar-stat {
-  display: flex;
-  justify-content: space-between;
-  align-items: center;
-  padding: 4px 0;
-  border-bottom: 1px solid var(--border-subtle);
-  font-family: var(--font-mono);
-  font-size: 0.68rem;
-}
-.pg-sidebar-stat-key { color: var(--text-muted); }
-.pg-sidebar-stat-val { color: var(--text-primary); font-weight: 500; }
-.pg-sb-section {
-  font-family: var(--font-mono);
-  font-size: 0.6rem;
-  text-transform: uppercase;
-  letter-spacing: 0.11em;
-  color: var(--text-muted);
-  margin: 0.9rem 0 0.45rem 0;
-}
+@st.cache_resource
+def _load_css() -> str:
+    """Read + minify the stylesheet once per process; reruns reuse the result."""
+    if STYLESHEET_MIN_PATH.exists():
+        return STYLESHEET_MIN_PATH.read_text(encoding="utf-8")
+    return _minify_css(STYLESHEET_PATH.read_text(encoding="utf-8"))
 
-/* ── Empty / idle state ────────────────────────────────────────────────────── */
-.pg-empty-state {
-  text-align: center;
-  padding: 3rem 1rem;
-  font-family: var(--font-mono);
-  font-size: 0.75rem;
-  color: var(--text-muted);
-  border: 1px dashed var(--border-subtle);
-  border-radius: var(--radius-md);
-  line-height: 1.8;
-}
-.pg-empty-icon { font-size: 2rem; display: block; margin-bottom: 0.5rem; }
-
-/* ── Chart card ────────────────────────────────────────────────────────────── */
-.pg-chart-card {
-  background: var(--bg-card);
-  border: 1px solid var(--border-subtle);
-  border-radius: var(--radius-md);
-  padding: 0.9rem 1rem;
-  box-shadow: var(--shadow-card);
-}
-.pg-chart-title {
-  font-family: var(--font-mono);
-  font-size: 0.62rem;
-  text-transform: uppercase;
-  letter-spacing: 0.1em;
-  color: var(--text-muted);
-  margin-bottom: 0.65rem;
-}
 
-/* ── Feedback form card ────────────────────────────────────────────────────── */
-.pg-form-card {
-  background: var(--bg-elevated);
-  border: 1px solid var(--border-default);
-  border-radius: var(--radius-md);
-  padding: 1rem 1.1rem;
-  margin-bottom: 0.5rem;
-  box-shadow: var(--shadow-card);
-}
-.pg-form-label {
-  font-family: var(--font-mono);
-  font-size: 0.6rem;
-  text-transform: uppercase;
-  letter-spacing: 0.1em;
-  color: var(--text-muted);
-  margin-bottom: 2px;
-}
-.pg-form-value {
-  font-family: var(--font-mono);
-  font-size: 0.82rem;
-  color: var(--text-primary);
-  margin-bottom: 0.55rem;
-}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"{FONT_LINKS}\n<style>\n{_load_css()}</style>\n", unsafe_allow_html=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -681,17 +109,69 @@ from data_generator import generate_dataset
 from pipeline import (
     run_pipeline, ensure_model_trained,
     get_automation_metrics, detect_repeat_atms,
-    ML_CONFIDENCE_THRESHOLD,
+    ML_CONFIDENCE_THRESHOLD, RESOLUTION_MODE_DTYPE,
     STABLE_DEMO, LIVE_SIM,
 )
-from impact_scorer import impact_label
+from impact_scorer import impact_labels
+from action_engine import escalation_mask
 from feedback_store import save_feedback, load_feedback, get_accuracy_summary
-from log_store import load_logs, get_log_summary
+from log_store import load_logs, get_log_summary, append_logs_from_dataframe, log_stamp
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  UTILITIES
 # ─────────────────────────────────────────────────────────────────────────────
+# Upload schema: only these columns are parsed, numerics as float64 so the
+# reader skips type inference and a blank cell parses (as NaN) instead of
+# aborting the read.  validate_upload() then reports blanks / out-of-range
+# values per column and casts the counters to int64.
+UPLOAD_COLUMNS = [
+    "atm_id", "location", "hour_of_day", "transaction_volume",
+    "avg_amount", "downtime_minutes", "complaint_count", "error_code",
+]
+# column: (min, max or None, whole numbers only)
+UPLOAD_RANGES = {
+    "hour_of_day":        (0, 23,   True),
+    "transaction_volume": (0, None, True),
+    "avg_amount":         (0, None, False),
+    "downtime_minutes":   (0, None, True),
+    "complaint_count":    (0, None, True),
+}
+UPLOAD_DTYPES = dict.fromkeys(UPLOAD_RANGES, "float64")
+UPLOAD_CHUNKSIZE = 50_000
+
+
+def validate_upload(df: pd.DataFrame) -> tuple[pd.DataFrame | None, list[str]]:
+    """
+    Check the numeric upload columns against UPLOAD_RANGES.
+    Returns (frame with whole-number columns as int64, []) or (None, problems).
+    """
+    if df.empty:
+        # The classifier cannot score zero samples
+        return None, ["file has no data rows"]
+    problems = []
+    for col, (lo, hi, whole) in UPLOAD_RANGES.items():
+        vals  = df[col]
+        blank = int(vals.isna().sum())
+        if blank:
+            problems.append(f"`{col}`: {blank:,} blank value(s)")
+            continue
+        bad = vals < lo
+        if hi is not None:
+            bad |= vals > hi
+        if whole:
+            bad |= vals % 1 != 0
+        n_bad = int(bad.sum())
+        if n_bad:
+            limits = f"{lo}–{hi}" if hi is not None else f"≥ {lo}"
+            kind   = "whole numbers " if whole else ""
+            problems.append(f"`{col}`: {n_bad:,} value(s) outside {kind}{limits}")
+    if problems:
+        return None, problems
+    whole_cols = [c for c, (_, _, whole) in UPLOAD_RANGES.items() if whole]
+    return df.astype(dict.fromkeys(whole_cols, "int64")), []
+
+
 @st.cache_resource(show_spinner="Initialising ML model…")
 def _boot_model_stable():
     """
@@ -707,16 +187,126 @@ def boot_model(execution_mode: str = STABLE_DEMO) -> None:
     Guarantee a trained model is in place before any UI is rendered.
 
     Stable Demo  → @st.cache_resource, runs once per session.
-    Live Sim     → trains fresh with random_state=None on every page load;
-                   not cached so each refresh gets a new model.
+    Live Sim     → trains fresh with random_state=None each time the session
+                   switches into Live Sim; not cached across sessions, so each
+                   page load gets a new model.
     """
     if execution_mode == LIVE_SIM:
-        with st.spinner("Live Simulation — training fresh model…"):
-            ensure_model_trained(LIVE_SIM)
+        # Sentinel: retrain once on entering Live Sim, not on every widget rerun
+        if not st.session_state.get("live_model_booted"):
+            with st.spinner("Live Simulation — training fresh model…"):
+                ensure_model_trained(LIVE_SIM)
+            st.session_state["live_model_booted"] = True
     else:
+        st.session_state["live_model_booted"] = False
         _boot_model_stable()
 
 
+@st.cache_data(show_spinner=False, ttl=3600)
+def _cached_dataset(n: int, seed: int) -> pd.DataFrame:
+    """Seeded demo batches are deterministic — generate each (n, seed) once."""
+    return generate_dataset(n, seed=seed)
+
+
+def _frame_digest(df: pd.DataFrame) -> bytes:
+    """Content hash of a frame (values + index) — one vectorised pass, no pickling."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy()).digest()
+
+
+@st.cache_data(
+    show_spinner=False, ttl=3600, max_entries=32,
+    hash_funcs={pd.DataFrame: _frame_digest},
+)
+def _cached_pipeline(
+    raw_df: pd.DataFrame, confidence_threshold: float, execution_mode: str
+) -> pd.DataFrame:
+    # Pure: persisting inside the cache would tie logging to cache hits/evictions
+    return run_pipeline(
+        raw_df,
+        confidence_threshold=confidence_threshold,
+        persist_logs=False,
+        execution_mode=execution_mode,
+    )
+
+
+def run_pipeline_cached(
+    raw_df: pd.DataFrame, confidence_threshold: float, execution_mode: str
+) -> pd.DataFrame:
+    """
+    Run the pipeline, reusing the previous result for identical inputs.
+    Never writes the log archive — the caller appends once per new pipeline_key.
+
+    Stable Demo  → cached on (raw_df, threshold, mode); widget reruns are free.
+    Live Sim     → always executed, so automation outcomes keep varying.
+    """
+    if execution_mode == LIVE_SIM:
+        return run_pipeline(
+            raw_df,
+            confidence_threshold=confidence_threshold,
+            persist_logs=False,
+            execution_mode=execution_mode,
+        )
+    return _cached_pipeline(raw_df, confidence_threshold, execution_mode)
+
+
+def overview_aggs(result_df: pd.DataFrame) -> dict:
+    """Overview KPIs and chart aggregates — one set of group-bys per pipeline run."""
+    kpi = result_df.agg({"impact_score": "sum", "downtime_minutes": "mean"})
+    issue_counts = result_df["predicted_issue"].value_counts()
+    return {
+        # Same rule that produced escalation_status, evaluated on the numeric columns
+        "escalated_n":     int(escalation_mask(result_df["impact_score"],
+                                               result_df["downtime_minutes"]).sum()),
+        "total_impact":    kpi["impact_score"],
+        "avg_downtime":    kpi["downtime_minutes"],
+        "issue_counts":    issue_counts,
+        "mode_counts":     result_df["resolution_mode"].value_counts(sort=False),  # triage order
+        "impact_by_issue": (result_df.groupby("predicted_issue", observed=True)["impact_score"]
+                            .sum().sort_values(ascending=False)),
+        "top_issue":       result_df["issue_label"].cat.categories[issue_counts.index.codes[0]],
+    }
+
+
+# The log archive is read through load_logs() / get_log_summary() directly:
+# log_store already reuses its parse and running totals until the file's
+# (mtime, size) stamp changes, which also catches writes by other processes.
+
+# Feedback reads: cleared on every write from this process; the TTL picks
+# up writes made by other processes (e.g. a second dashboard instance).
+@st.cache_data(show_spinner=False, ttl=30)
+def _cached_feedback() -> pd.DataFrame:
+    return load_feedback()
+
+
+@st.cache_data(show_spinner=False, ttl=30)
+def _cached_accuracy_summary() -> dict:
+    return get_accuracy_summary(_cached_feedback())
+
+
+def _invalidate_feedback() -> None:
+    """Call after a feedback record is saved."""
+    _cached_feedback.clear()
+    _cached_accuracy_summary.clear()
+
+
+RESULTS_EXPORT_COLS = [
+    "atm_id", "location", "predicted_issue", "ml_confidence",
+    "impact_score", "downtime_minutes", "resolution_mode",
+    "recommended_action", "responsible_team", "sla_minutes",
+    "escalation_status", "eligibility_reason", "automation_log",
+]
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _log_archive_csv(stamp: tuple[int, int]) -> bytes:
+    """
+    CSV export of the whole log archive.  `stamp` is log_store's (mtime_ns, size)
+    file stamp — the cache key, so the archive is never content-hashed.
+    """
+    return load_logs().to_csv(index=False).encode("utf-8")
+
+
+@lru_cache(maxsize=4096)
 def fmt_inr(val: float) -> str:
     if val >= 1_000_000:
         return f"₹{val/1_000_000:.2f}M"
@@ -725,171 +315,484 @@ def fmt_inr(val: float) -> str:
     return f"₹{val:.0f}"
 
 
+def fmt_inr_array(vals: pd.Series) -> pd.Series:
+    """Vectorised fmt_inr() for formatting a whole column at once."""
+    out = np.select(
+        [vals >= 1_000_000, vals >= 1_000],
+        [
+            "₹" + (vals / 1_000_000).map("{:.2f}M".format),
+            "₹" + (vals / 1_000).map("{:.1f}K".format),
+        ],
+        default="₹" + vals.map("{:.0f}".format),
+    )
+    return pd.Series(out, index=vals.index)
+
+
+# ── HTML templates ────────────────────────────────────────────────────────────
+# Built once at import; call sites fill them with .format_map() and a small dict.
+_SECTION_LABEL_TPL = '<div class="pg-section-label">{icon}&nbsp; {text}</div>'
+
+_MODE_HEADER_TPL = """<div class="pg-mode-header {color}">
+              <span style="font-size:1.05rem">{icon}</span>
+              <span style="font-weight:500;letter-spacing:0.03em">{title}</span>
+              <span class="pg-mode-count">{count}</span>
+              <span class="pg-mode-impact">₹{total:,.0f} total exposure</span>
+            </div>"""
+
+_HEADER_TPL = """<div class="pg-header">
+          <div>
+            <div class="pg-logo">Pay<span>Guard</span>&nbsp;OPS</div>
+            <div class="pg-tagline">Automated Payment Incident Intelligence Platform</div>
+          </div>
+          <div class="pg-header-right">
+            <div class="pg-timestamp">
+              <span class="pg-live-dot"></span>LIVE &nbsp;·&nbsp; {now}
+            </div>
+            <div class="pg-model-badge">RandomForest · {mode}</div>
+          </div>
+        </div>"""
+
+_SB_STAT_TPL = (
+    '<div class="pg-sidebar-stat">'
+    '<span class="pg-sidebar-stat-key">{key}</span>'
+    '<span class="pg-sidebar-stat-val">{val}</span>'
+    '</div>'
+)
+
+_MODE_CAPTION_TPL = (
+    '<div style="font-family:var(--font-mono);font-size:0.65rem;'
+    'color:var(--text-muted);margin:0.5rem 0 0.35rem 0;">'
+    '{count} incident(s) — sorted by financial exposure, highest first</div>'
+)
+
+
+_METRIC_CARD_TPL = (
+    '<div class="pg-metric" title="{help}">'
+    '<div class="pg-metric-label">{label}</div>'
+    '<div class="pg-metric-value">{value}</div>'
+    '{delta}</div>'
+)
+
+_METRIC_DELTA_TPL = '<div class="pg-metric-delta {tone}">{arrow} {delta}</div>'
+
+
+@lru_cache(maxsize=1024)
 def conf_pill_html(conf: float) -> str:
+    # ml_confidence is rounded to 4 dp in prepare_results, so the key space is small
     cls = "conf-high" if conf >= 0.8 else ("conf-med" if conf >= 0.6 else "conf-low")
     return f'<span class="conf-pill {cls}">{conf:.0%}</span>'
 
 
 def section_label(icon: str, text: str) -> None:
-    st.markdown(
-        f'<div class="pg-section-label">{icon}&nbsp; {text}</div>',
-        unsafe_allow_html=True,
+    st.html(_SECTION_LABEL_TPL.format_map({"icon": icon, "text": text}))
+
+
+class MetricCard(NamedTuple):
+    """One KPI card; delta_color follows st.metric: "normal" (rise is good), "inverse", "off"."""
+    label: str
+    value: object
+    delta: object = None
+    delta_color: str = "normal"
+    help: str = ""
+
+
+def metric_grid(cards: list[MetricCard]) -> None:
+    """One row of KPI cards as a single html element, styled like st.metric."""
+    esc = html.escape    # quote=True: help text lands inside a title="…" attribute
+    parts = []
+    for card in cards:
+        delta_html = ""
+        if card.delta is not None:
+            falling = str(card.delta).startswith("-")
+            if card.delta_color == "off":
+                tone = "off"
+            else:
+                tone = "good" if falling == (card.delta_color == "inverse") else "bad"
+            delta_html = _METRIC_DELTA_TPL.format_map({
+                "tone": tone, "arrow": "↓" if falling else "↑", "delta": esc(str(card.delta)),
+            })
+        parts.append(_METRIC_CARD_TPL.format_map({
+            "label": esc(str(card.label)), "value": esc(str(card.value)),
+            "delta": delta_html, "help": esc(str(card.help)),
+        }))
+    st.html(f'<div class="pg-metric-grid" style="--cols:{len(cards)}">{"".join(parts)}</div>')
+
+
+def prepare_results(result_df: pd.DataFrame) -> pd.DataFrame:
+    """Dashboard-side post-processing of a pipeline result (dtypes + card labels)."""
+    # Low-cardinality label columns → categorical, so value_counts / groupby /
+    # isin in the dashboard run on integer codes instead of Python strings.
+    # Categories keep first-appearance order so value_counts tie-breaks are unchanged;
+    # blank cells (e.g. from an uploaded CSV) stay missing rather than a category.
+    for col in ("predicted_issue", "responsible_team", "atm_id", "location", "error_code"):
+        result_df[col] = pd.Categorical(result_df[col], categories=result_df[col].dropna().unique())
+    result_df["resolution_mode"] = result_df["resolution_mode"].astype(RESOLUTION_MODE_DTYPE)
+    # Confidence is only shown as a %; 4 dp is display/export precision.
+    result_df["ml_confidence"] = result_df["ml_confidence"].round(4)
+    # Small-range counters → narrowest int dtype.  Money columns stay float64:
+    # float32 would visibly round the ₹ totals shown on the dashboard.
+    for col in ("hour_of_day", "transaction_volume", "downtime_minutes",
+                "complaint_count", "sla_minutes"):
+        result_df[col] = pd.to_numeric(result_df[col], downcast="integer")
+    # Display names: one vectorised pass over the categories; the codes stay
+    # aligned with predicted_issue, so either column indexes the other's labels.
+    issues = result_df["predicted_issue"].cat
+    result_df["issue_label"] = issues.rename_categories(
+        issues.categories.str.replace("_", " ", regex=False).str.title()
     )
 
+    # Severity band per incident: one pd.cut over the column, not a call per card
+    result_df["sev_label"] = impact_labels(result_df["impact_score"])
+
+    # Incident-card labels depend only on the row — format them once per run
+    # rather than inside render_incident_card on every rerun.
+    # Blank upload cells stay missing in the categoricals; show them as ""
+    # here so one NaN doesn't turn the whole label into <NA>
+    result_df["card_label"] = (
+        result_df["atm_id"].astype(object).fillna("").astype(str) + "  ·  "
+        + result_df["location"].astype(object).fillna("").astype(str) + "  ·  "
+        + result_df["issue_label"].astype(str) + "  ·  "
+        + result_df["sev_label"].astype(str) + "  ₹"
+        + result_df["impact_score"].map("{:,.0f}".format)
+    )
+
+    # Remaining free-text columns (actions, logs, gate reasons, labels) →
+    # pandas' string dtype (missing values become pd.NA).  Not "string[pyarrow]":
+    # pyarrow is optional here, as in the upload reader and log_store.
+    text_cols = result_df.select_dtypes(include=["object", "string"]).columns
+    result_df[text_cols] = result_df[text_cols].astype("string")
+    return result_df
+
+
+# Incident-card body, compiled once.  Both detail columns + the action box go
+# out as ONE html element; a CSS grid replaces the st.columns(2) container.
+# Styling lives in styles.css classes so no inline styles ride along per card.
+_CARD_TMPL = Template("""
+<div class="pg-card-cols">
+  <div class="pg-detail-grid">
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Issue</span>
+      <span class="pg-detail-val">$issue_label</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Downtime</span>
+      <span class="pg-detail-val">$downtime min</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Volume</span>
+      <span class="pg-detail-val">$volume txns</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Avg Value</span>
+      <span class="pg-detail-val">₹$avg_amount</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Complaints</span>
+      <span class="pg-detail-val">$complaints</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Confidence</span>
+      <span class="pg-detail-val">$conf_pill</span>
+    </div>
+  </div>
+  <div class="pg-detail-grid">
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Team</span>
+      <span class="pg-detail-val">$team</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">SLA</span>
+      <span class="pg-detail-val">$sla min</span>
+    </div>
+    <div class="pg-detail-row">
+      <span class="pg-detail-key">Escalation</span>
+      <span class="pg-detail-val pg-detail-val--small">$escalation</span>
+    </div>
+    $gate_row
+  </div>
+</div>
+<div class="pg-action-box">⚡&nbsp; $action</div>
+""")
+
+_GATE_ROW_TMPL = Template(
+    '<div class="pg-detail-row"><span class="pg-detail-key">Auto Gate</span>'
+    '<span class="pg-detail-val pg-detail-val--muted">$gate</span></div>'
+)
 
-def render_incident_card(row: pd.Series) -> None:
-    """Fully styled incident detail expander card."""
-    conf   = row.get("ml_confidence", 1.0)
-    impact = row["impact_score"]
-    sev    = impact_label(impact)
 
-    title = (
-        f"{row['atm_id']}  ·  {row['location']}  ·  "
-        f"{row['predicted_issue'].replace('_',' ').title()}  ·  "
-        f"{sev}  ₹{impact:,.0f}"
+@lru_cache(maxsize=2048)
+def _card_html(
+    issue_label: str, downtime, volume, avg_amount, complaints, conf: float,
+    team: str, sla, escalation: str, gate: str, action: str,
+) -> str:
+    """Render the card body; identical incidents across reruns are cache hits."""
+    return _CARD_TMPL.substitute(
+        issue_label=issue_label,
+        downtime=downtime,
+        volume=f"{volume:,}",
+        avg_amount=f"{avg_amount:,.0f}",
+        complaints=complaints,
+        conf_pill=conf_pill_html(conf),
+        team=team,
+        sla=sla,
+        escalation=escalation,
+        gate_row=_GATE_ROW_TMPL.substitute(gate=gate) if gate else "",
+        action=action,
     )
 
-    with st.expander(title, expanded=False):
-        left_col, right_col = st.columns(2)
 
-        with left_col:
-            st.markdown(
-                f"""
-                <div class="pg-detail-grid">
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Issue</span>
-                    <span class="pg-detail-val">{row['predicted_issue'].replace('_',' ').title()}</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Downtime</span>
-                    <span class="pg-detail-val">{row['downtime_minutes']} min</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Volume</span>
-                    <span class="pg-detail-val">{row['transaction_volume']:,} txns</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Avg Value</span>
-                    <span class="pg-detail-val">₹{row['avg_amount']:,.0f}</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Complaints</span>
-                    <span class="pg-detail-val">{row['complaint_count']}</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Confidence</span>
-                    <span class="pg-detail-val">{conf_pill_html(conf)}</span>
-                  </div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+def render_incident_card(row) -> None:
+    """Fully styled incident detail expander card (row is an `Incident` namedtuple)."""
+    conf = getattr(row, "ml_confidence", 1.0)
+    # Text columns use the string dtype: a missing value is pd.NA, whose truth
+    # value is ambiguous, so test with pd.notna before `if`
+    gate = getattr(row, "eligibility_reason", "")
 
-        with right_col:
-            gate = row.get("eligibility_reason", "")
-            st.markdown(
-                f"""
-                <div class="pg-detail-grid">
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Team</span>
-                    <span class="pg-detail-val">{row['responsible_team']}</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">SLA</span>
-                    <span class="pg-detail-val">{row['sla_minutes']} min</span>
-                  </div>
-                  <div class="pg-detail-row">
-                    <span class="pg-detail-key">Escalation</span>
-                    <span class="pg-detail-val" style="font-size:0.68rem">{row['escalation_status']}</span>
-                  </div>
-                  {f'<div class="pg-detail-row"><span class="pg-detail-key">Auto Gate</span><span class="pg-detail-val" style="color:var(--text-secondary);font-size:0.68rem">{gate}</span></div>' if gate else ''}
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+    card_html = _card_html(
+        row.issue_label, row.downtime_minutes, row.transaction_volume,
+        row.avg_amount, row.complaint_count, conf,
+        row.responsible_team, row.sla_minutes, row.escalation_status,
+        gate if pd.notna(gate) else "", row.recommended_action,
+    )
 
-        # Recommended action
-        st.markdown(
-            f'<div class="pg-action-box">⚡&nbsp; {row["recommended_action"]}</div>',
-            unsafe_allow_html=True,
-        )
+    with st.expander(row.card_label, expanded=False):
+        st.html(card_html)
 
         # Automation log
-        if row.get("automation_log"):
-            st.code(row["automation_log"], language=None)
+        log = getattr(row, "automation_log", "")
+        if pd.notna(log) and log:
+            st.code(log, language=None)
+
+
+def mode_panel_stats(result_df: pd.DataFrame) -> dict:
+    """
+    Header/KPI figures for every resolution-mode panel, from grouped passes
+    over the whole result instead of filtering it once per panel.
+    Returns {mode: {count, total_impact, avg_impact, avg_auto_time, top_issue}},
+    with top_issue as its display label.
+    """
+    times = result_df["auto_resolution_time_sec"]
+    # One groupby yields every numeric figure (only non-zero auto times count)
+    agg = pd.DataFrame({
+        "impact": result_df["impact_score"],
+        "auto_t": times.where(times > 0),
+    }).groupby(result_df["resolution_mode"], observed=False).agg(
+        count=("impact", "size"),
+        total_impact=("impact", "sum"),
+        avg_impact=("impact", "mean"),
+        avg_auto_time=("auto_t", "mean"),
+    )
+    # Top issue per mode: one bincount over combined (mode, issue) category codes
+    issues   = result_df["predicted_issue"].cat
+    labels   = result_df["issue_label"].cat.categories
+    n_issues = len(issues.categories)
+    pair_codes = (result_df["resolution_mode"].cat.codes.to_numpy() * n_issues
+                  + issues.codes.to_numpy())
+    top_codes  = np.bincount(
+        pair_codes, minlength=len(agg) * n_issues
+    ).reshape(len(agg), n_issues).argmax(axis=1)
+    return {
+        mode: {
+            "count":         int(count),
+            "total_impact":  total_impact,
+            "avg_impact":    avg_impact,
+            "avg_auto_time": avg_auto_time,
+            "top_issue":     labels[top] if count else None,
+        }
+        for (mode, count, total_impact, avg_impact, avg_auto_time), top
+        in zip(agg.itertuples(), top_codes)
+    }
 
 
 def render_mode_panel(
-    df: pd.DataFrame,
-    mode: str,
+    subset: pd.DataFrame,
+    stats: dict,
     color: str,
     icon: str,
     title: str,
     avg_time_label: str | None = None,
 ) -> None:
     """Full resolution-mode panel: coloured header, mini KPIs, incident cards."""
-    subset       = df[df["resolution_mode"] == mode]
-    count        = len(subset)
-    total_impact = subset["impact_score"].sum() if count else 0
-    avg_impact   = subset["impact_score"].mean() if count else 0
-
-    avg_t_str = "—"
-    if avg_time_label and count and "auto_resolution_time_sec" in subset.columns:
-        vals = subset[subset["auto_resolution_time_sec"] > 0]["auto_resolution_time_sec"]
-        if len(vals):
-            avg_t_str = f"{vals.mean():.0f}s"
-
-    st.markdown(
-        f"""<div class="pg-mode-header {color}">
-              <span style="font-size:1.05rem">{icon}</span>
-              <span style="font-weight:500;letter-spacing:0.03em">{title}</span>
-              <span class="pg-mode-count">{count}</span>
-              <span class="pg-mode-impact">₹{total_impact:,.0f} total exposure</span>
-            </div>""",
-        unsafe_allow_html=True,
-    )
+    count = stats["count"]
 
     if count == 0:
-        st.markdown(
+        # Empty mode: header + empty state only — no KPI formatting at all
+        st.html(_MODE_HEADER_TPL.format_map(
+            {"color": color, "icon": icon, "title": title, "count": 0, "total": 0}
+        ))
+        st.html(
             '<div class="pg-empty-state" style="padding:1.5rem">'
             '<span class="pg-empty-icon" style="font-size:1.2rem">✓</span>'
-            'No incidents in this category for this run.</div>',
-            unsafe_allow_html=True,
+            'No incidents in this category for this run.</div>'
         )
         return
 
+    total_impact = stats["total_impact"]
+    st.html(_MODE_HEADER_TPL.format_map(
+        {"color": color, "icon": icon, "title": title,
+         "count": count, "total": total_impact}
+    ))
+
     mk1, mk2, mk3, mk4 = st.columns(4)
     mk1.metric("Incidents",       count)
     mk2.metric("Total Exposure",  fmt_inr(total_impact))
-    mk3.metric("Avg Exposure",    fmt_inr(avg_impact))
+    mk3.metric("Avg Exposure",    fmt_inr(stats["avg_impact"]))
     if avg_time_label:
-        mk4.metric(avg_time_label, avg_t_str)
+        avg_t = stats["avg_auto_time"]
+        mk4.metric(avg_time_label, f"{avg_t:.0f}s" if pd.notna(avg_t) else "—")
     else:
-        top = subset["predicted_issue"].value_counts().idxmax().replace("_"," ").title()
-        mk4.metric("Top Issue", top)
-
-    st.markdown(
-        f'<div style="font-family:var(--font-mono);font-size:0.65rem;'
-        f'color:var(--text-muted);margin:0.5rem 0 0.35rem 0;">'
-        f'{count} incident(s) — sorted by financial exposure, highest first</div>',
-        unsafe_allow_html=True,
-    )
-    for _, row in subset.sort_values("impact_score", ascending=False).iterrows():
+        mk4.metric("Top Issue", stats["top_issue"])
+
+    st.html(_MODE_CAPTION_TPL.format_map({"count": count}))
+    # subset arrives pre-sorted by impact_score, highest first
+    for row in subset.itertuples(index=False, name="Incident"):
         render_incident_card(row)
 
 
+@st.fragment
+def render_log_archive_tab() -> None:
+    """
+    Persistent log archive: KPIs, mode filter, recent records, export.
+
+    Runs as a fragment so changing the mode filter reruns only this tab.
+    """
+    section_label("📁", "Persistent Automation Log Archive")
+    log_df = load_logs()
+
+    if log_df.empty:
+        st.html(
+            '<div class="pg-empty-state"><span class="pg-empty-icon">📭</span>'
+            'No log records yet. Run an analysis to populate the archive.</div>'
+        )
+    else:
+        # One counting pass; the ordered dtype lists every mode, zeros included
+        log_modes = log_df["resolution_mode"].astype(RESOLUTION_MODE_DTYPE).value_counts(sort=False)
+        lk1, lk2, lk3, lk4 = st.columns(4)
+        lk1.metric("Total Records",   f"{len(log_df):,}")
+        lk2.metric("Auto-Resolved",   f"{log_modes['AUTO_RESOLVED']:,}")
+        lk3.metric("Auto-Attempted",  f"{log_modes['AUTO_ATTEMPTED']:,}")
+        lk4.metric("Manual Required", f"{log_modes['MANUAL_REQUIRED']:,}")
+
+        st.markdown("<div style='height:0.4rem'></div>", unsafe_allow_html=True)
+        fc, _ = st.columns([2, 3])
+        with fc:
+            filter_mode = st.selectbox(
+                "Filter by mode",
+                ["All", "AUTO_RESOLVED", "AUTO_ATTEMPTED", "MANUAL_REQUIRED"],
+                key="log_filter",
+            )
+        view_df = log_df if filter_mode == "All" else log_df[log_df["resolution_mode"] == filter_mode]
+        # Slice to the visible rows first, so only these 50 rows get formatted
+        disp = view_df[[
+            "timestamp", "atm_id", "predicted_issue", "impact_score",
+            "resolution_mode", "auto_resolution_time_sec", "eligibility_reason",
+        ]].tail(50).rename(columns={
+            "timestamp": "Timestamp", "atm_id": "ATM ID",
+            "predicted_issue": "Issue", "impact_score": "Impact",
+            "resolution_mode": "Mode",
+            "auto_resolution_time_sec": "Auto Time (s)",
+            "eligibility_reason": "Automation Gate",
+        })
+        # Preformatted: NumberColumn's sprintf-style format has no thousands
+        # grouping, and the named presets need a newer Streamlit than we pin
+        disp["Impact"] = "₹" + disp["Impact"].map("{:,.0f}".format)
+        st.dataframe(disp, use_container_width=True, hide_index=True, height=400)
+        st.download_button(
+            "⬇  Download Full Log Archive (CSV)",
+            _log_archive_csv(log_stamp()),
+            file_name="payguard_automation_logs.csv", mime="text/csv",
+        )
+
+
+@st.fragment
+def render_feedback_tab() -> None:
+    """
+    Technician feedback form + history.
+
+    Runs as a fragment: picking an ATM or editing the form only reruns this
+    function, not the pipeline views and incident cards in the other tabs.
+    """
+    section_label("🔁", "Technician Feedback Loop")
+    st.caption("Submit corrections to improve model accuracy over time. Feedback is written to data/feedback.csv.")
+
+    result_df_saved = st.session_state.get("result_df", None)
+
+    if result_df_saved is None:
+        st.html(
+            '<div class="pg-empty-state"><span class="pg-empty-icon">📋</span>'
+            'Run an analysis first to enable feedback submission.</div>'
+        )
+    else:
+        feedback_candidates = result_df_saved[
+            result_df_saved["resolution_mode"].isin(["MANUAL_REQUIRED", "AUTO_ATTEMPTED"])
+        ]
+        if feedback_candidates.empty:
+            feedback_candidates = result_df_saved
+
+        fb_col1, fb_col2 = st.columns(2)
+
+        with fb_col1:
+            section_label("◈", "Select Incident")
+            fb_atm  = st.selectbox("ATM ID", feedback_candidates["atm_id"].tolist(), key="fb_atm_select")
+            matched = feedback_candidates[feedback_candidates["atm_id"] == fb_atm].iloc[0]
+            st.html(
+                f"""
+                <div class="pg-form-card">
+                  <div class="pg-form-label">Predicted Issue</div>
+                  <div class="pg-form-value">{matched['issue_label']}</div>
+                  <div class="pg-form-label">Resolution Mode</div>
+                  <div class="pg-form-value">{matched['resolution_mode']}</div>
+                  <div class="pg-form-label">ML Confidence</div>
+                  <div class="pg-form-value">{matched.get('ml_confidence', 1.0):.1%}</div>
+                </div>
+                """
+            )
+
+        with fb_col2:
+            section_label("◈", "Technician Assessment")
+            ISSUE_TYPES = ["network_failure","card_declined","hardware_fault","cash_out","auth_timeout"]
+            fb_actual   = st.selectbox(
+                "Actual Issue Diagnosed", ISSUE_TYPES,
+                index=ISSUE_TYPES.index(matched["predicted_issue"])
+                      if matched["predicted_issue"] in ISSUE_TYPES else 0,
+                key="fb_actual",
+            )
+            fb_helpful  = st.radio(
+                "Was recommended action helpful?",
+                ["yes","partial","no"], horizontal=True, key="fb_helpful",
+            )
+            fb_res_time = st.number_input("Resolution Time (min)", 0, 600, 30, key="fb_res")
+            fb_notes    = st.text_area("Notes (optional)", key="fb_notes", height=80)
+            if st.button("✅  Submit Feedback", type="primary"):
+                save_feedback(
+                    atm_id=fb_atm,
+                    predicted_issue=matched["predicted_issue"],
+                    technician_actual_issue=fb_actual,
+                    action_helpful=fb_helpful,
+                    technician_notes=fb_notes,
+                    resolution_time_minutes=fb_res_time,
+                )
+                _invalidate_feedback()
+                st.success("Feedback recorded successfully.")
+                st.rerun()
+
+    feedback_df = _cached_feedback()
+    if not feedback_df.empty:
+        section_label("◈", "Feedback History (last 20)")
+        st.dataframe(feedback_df.tail(20), use_container_width=True, hide_index=True, height=280)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  SIDEBAR
 # ─────────────────────────────────────────────────────────────────────────────
 with st.sidebar:
-    st.markdown(
+    st.html(
         '<div class="pg-sidebar-logo">Pay<span>Guard</span></div>'
-        '<div class="pg-sidebar-tagline">Operations Centre · v2.0</div>',
-        unsafe_allow_html=True,
+        '<div class="pg-sidebar-tagline">Operations Centre · v2.0</div>'
     )
     st.divider()
 
-    st.markdown('<div class="pg-sb-section">⚙ Configuration</div>', unsafe_allow_html=True)
+    st.html('<div class="pg-sb-section">⚙ Configuration</div>')
 
     # ── Execution Mode toggle ─────────────────────────────────────────────────
     execution_mode = st.radio(
@@ -899,7 +802,8 @@ with st.sidebar:
         key="execution_mode",
         help=(
             "Stable Demo: fixed seed everywhere — identical results every run.\n"
-            "Live Simulation: no seeding — model retrains fresh, outcomes vary."
+            "Live Simulation: no seeding — model retrains fresh each time you "
+            "switch into this mode, outcomes vary every run."
         ),
     )
     # Note: session state is managed automatically by the key= argument above.
@@ -910,7 +814,7 @@ with st.sidebar:
     if execution_mode == STABLE_DEMO:
         st.caption("🔒 Deterministic · seed=42 · reproducible")
     else:
-        st.caption("🎲 Randomised · fresh retrain each run")
+        st.caption("🎲 Randomised · retrained on entering mode")
 
     st.divider()
 
@@ -923,7 +827,7 @@ with st.sidebar:
     st.caption(f"Below {confidence_threshold:.0%} → MANUAL_REQUIRED")
 
     st.divider()
-    st.markdown('<div class="pg-sb-section">◈ Data Source</div>', unsafe_allow_html=True)
+    st.html('<div class="pg-sb-section">◈ Data Source</div>')
     mode = st.radio(
         "input_mode",
         ["Generate Demo Data", "Upload CSV", "Manual Entry"],
@@ -931,35 +835,31 @@ with st.sidebar:
     )
 
     st.divider()
-    st.markdown('<div class="pg-sb-section">◈ System Telemetry</div>', unsafe_allow_html=True)
-    stats    = get_accuracy_summary()
-    log_stat = get_log_summary()
-
-    def _sb_stat(k, v):
-        st.markdown(
-            f'<div class="pg-sidebar-stat">'
-            f'<span class="pg-sidebar-stat-key">{k}</span>'
-            f'<span class="pg-sidebar-stat-val">{v}</span>'
-            f'</div>',
-            unsafe_allow_html=True,
-        )
-
-    _sb_stat("Log archive",          f"{log_stat['total_logged']:,} records")
-    _sb_stat("Auto-resolved (all)",  f"{log_stat['auto_resolved']:,}")
-    _sb_stat("Avg auto-resolve",     f"{log_stat['avg_auto_time_sec']:.0f}s")
-    _sb_stat("Feedback records",     f"{stats['total']:,}")
+    st.html('<div class="pg-sb-section">◈ System Telemetry</div>')
+    stats    = _cached_accuracy_summary()
+    log_stat = get_log_summary()   # running totals on disk — no archive parse
+
+    sb_rows = [
+        ("Log archive",          f"{log_stat['total_logged']:,} records"),
+        ("Auto-resolved (all)",  f"{log_stat['auto_resolved']:,}"),
+        ("Avg auto-resolve",     f"{log_stat['avg_auto_time_sec']:.0f}s"),
+        ("Feedback records",     f"{stats['total']:,}"),
+    ]
     if stats["total"] > 0:
-        _sb_stat("Technician accuracy", f"{stats['accuracy']}%")
+        sb_rows.append(("Technician accuracy", f"{stats['accuracy']}%"))
+    # All telemetry rows go out as one element instead of one per stat
+    st.html("".join(
+        _SB_STAT_TPL.format_map({"key": k, "val": v}) for k, v in sb_rows
+    ))
 
     st.divider()
-    st.markdown(
+    st.html(
         '<div style="font-family:var(--font-mono);font-size:0.58rem;'
         'color:var(--text-muted);line-height:1.7;padding:0.25rem 0;">'
         'RandomForest · Rule Engine<br>'
         'Automation Layer · Feedback Loop<br>'
         'Fully Offline · No Cloud APIs'
-        '</div>',
-        unsafe_allow_html=True,
+        '</div>'
     )
 
 
@@ -967,31 +867,28 @@ with st.sidebar:
 #  HEADER BAR
 # ─────────────────────────────────────────────────────────────────────────────
 boot_model(execution_mode)
-now_str = datetime.datetime.now().strftime("%d %b %Y  %H:%M")
-
-st.markdown(
-    f"""
-    <div class="pg-header">
-      <div>
-        <div class="pg-logo">Pay<span>Guard</span>&nbsp;OPS</div>
-        <div class="pg-tagline">Automated Payment Incident Intelligence Platform</div>
-      </div>
-      <div class="pg-header-right">
-        <div class="pg-timestamp">
-          <span class="pg-live-dot"></span>LIVE &nbsp;·&nbsp; {now_str}
-        </div>
-        <div class="pg-model-badge">RandomForest · {execution_mode}</div>
-      </div>
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+
+
+@st.fragment(run_every=30)
+def render_header(execution_mode: str) -> None:
+    """
+    Header bar with the live clock.  As a timed fragment the timestamp ticks
+    on its own every 30s without rerunning the dashboard below it.
+    """
+    st.html(_HEADER_TPL.format_map({
+        "now": datetime.datetime.now().strftime("%d %b %Y  %H:%M"),
+        "mode": execution_mode,
+    }))
+
+
+render_header(execution_mode)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  DATA INPUT
 # ─────────────────────────────────────────────────────────────────────────────
 raw_df = None
+raw_key = None   # identifies raw_df's content without re-hashing it each rerun
 
 if mode == "Generate Demo Data":
     inp_col, btn_col = st.columns([5, 1])
@@ -1007,18 +904,51 @@ if mode == "Generate Demo Data":
             with st.spinner("Generating batch and running 5-layer pipeline…"):
                 # Stable Demo: fixed seed → identical batch every run.
                 # Live Sim:   seed=None → different batch every run.
-                gen_seed = 42 if execution_mode == STABLE_DEMO else None
-                raw_df = generate_dataset(n, seed=gen_seed)
-                st.session_state["demo_df"] = raw_df
+                if execution_mode == STABLE_DEMO:
+                    raw_df = _cached_dataset(n, 42)
+                else:
+                    raw_df = generate_dataset(n, seed=None)
+                st.session_state["demo_df"]  = raw_df
+                st.session_state["demo_key"] = _frame_digest(raw_df)
         else:
             raw_df = st.session_state["demo_df"]
+        raw_key = st.session_state["demo_key"]
 
 elif mode == "Upload CSV":
     st.caption("Required columns: atm_id · location · hour_of_day · transaction_volume · avg_amount · downtime_minutes · complaint_count · error_code")
     uploaded = st.file_uploader("Drop CSV file here", type=["csv"], label_visibility="collapsed")
     if uploaded:
-        raw_df = pd.read_csv(uploaded)
-        st.success(f"Loaded {len(raw_df):,} rows from {uploaded.name}")
+        read_kw = {"usecols": UPLOAD_COLUMNS, "dtype": UPLOAD_DTYPES}
+        try:
+            try:
+                # Arrow-backed columns: faster parse, compact string storage
+                raw_df = pd.read_csv(
+                    uploaded, engine="pyarrow", dtype_backend="pyarrow", **read_kw
+                )
+            except ImportError:
+                # C parser fallback: bounded peak memory via chunked reads
+                uploaded.seek(0)
+                raw_df = pd.concat(
+                    pd.read_csv(uploaded, chunksize=UPLOAD_CHUNKSIZE, **read_kw),
+                    ignore_index=True,
+                )
+        except (ValueError, KeyError) as exc:     # missing column / non-numeric text
+            raw_df = None
+            st.error(
+                f"Could not read {uploaded.name}: {exc}\n\n"
+                "Check that every required column is present and that the numeric "
+                "columns (" + ", ".join(UPLOAD_RANGES) + ") contain only numbers."
+            )
+        else:
+            raw_df, problems = validate_upload(raw_df)
+            if problems:
+                st.error(
+                    f"{uploaded.name} has invalid values:\n\n"
+                    + "\n".join(f"- {p}" for p in problems)
+                )
+            else:
+                raw_key = uploaded.file_id   # stable across reruns for the same upload
+                st.success(f"Loaded {len(raw_df):,} rows from {uploaded.name}")
 
 elif mode == "Manual Entry":
     section_label("✏", "Single Incident Entry")
@@ -1047,27 +977,64 @@ elif mode == "Manual Entry":
             "downtime_minutes": downtime, "complaint_count": complaints,
             "error_code": error_code,
         }])
+        raw_key = _frame_digest(raw_df)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  RESULTS  — tab-based layout
 # ─────────────────────────────────────────────────────────────────────────────
 if raw_df is not None:
-    with st.spinner("Running pipeline: classify → score → escalate → automate → persist…"):
-        result_df   = run_pipeline(
-            raw_df,
-            confidence_threshold=confidence_threshold,
-            execution_mode=execution_mode,
-        )
-    st.session_state["result_df"] = result_df
+    # Only re-run when the data, threshold or mode actually changed — unrelated
+    # widget reruns (feedback form, log filter, …) reuse the stored result.
+    pipeline_key = (
+        raw_key,
+        confidence_threshold,
+        execution_mode,
+    )
+    if st.session_state.get("pipeline_key") != pipeline_key or "result_df" not in st.session_state:
+        with st.spinner("Running pipeline: classify → score → escalate → automate → persist…"):
+            result_df = run_pipeline_cached(raw_df, confidence_threshold, execution_mode)
+            # Exactly one archive append per new pipeline_key, cache hit or not
+            append_logs_from_dataframe(result_df)
+            result_df = prepare_results(result_df)
+        # One sort + partition per pipeline run feeds all three mode tabs,
+        # already ordered by exposure, and is reused across widget reruns.
+        by_exposure = result_df.sort_values("impact_score", ascending=False, kind="stable")
+        st.session_state["mode_groups"]  = dict(list(
+            by_exposure.groupby("resolution_mode", observed=True, sort=False)
+        ))
+        # Every figure derived from the result is computed here, once per
+        # pipeline_key, and reused by widget reruns straight from session_state
+        st.session_state["run_aggs"] = {
+            "auto_metrics": get_automation_metrics(result_df),
+            "repeat_df":    detect_repeat_atms(result_df),
+            "overview":     overview_aggs(result_df),
+            "panel_stats":  mode_panel_stats(result_df),
+            "results_csv":  result_df[
+                [c for c in RESULTS_EXPORT_COLS if c in result_df.columns]
+            ].to_csv(index=False).encode("utf-8"),
+        }
+        st.session_state["result_df"]    = result_df
+        st.session_state["pipeline_key"] = pipeline_key
+    else:
+        result_df = st.session_state["result_df"]
+    mode_groups = st.session_state["mode_groups"]
+    run_aggs    = st.session_state["run_aggs"]
 
-    auto_metrics  = get_automation_metrics(result_df)
-    repeat_df     = detect_repeat_atms(result_df)
+    auto_metrics  = run_aggs["auto_metrics"]
+    repeat_df     = run_aggs["repeat_df"]
     total         = len(result_df)
-    escalated_n   = result_df["escalation_status"].str.contains("ESCALATED").sum()
-    total_impact  = result_df["impact_score"].sum()
-    top_issue     = result_df["predicted_issue"].value_counts().idxmax()
-    avg_downtime  = result_df["downtime_minutes"].mean()
+    # Shared aggregates — computed per run, reused by the KPIs and the charts
+    ov              = run_aggs["overview"]
+    escalated_n     = ov["escalated_n"]
+    total_impact    = ov["total_impact"]
+    avg_downtime    = ov["avg_downtime"]
+    issue_counts    = ov["issue_counts"]
+    mode_counts     = ov["mode_counts"]
+    impact_by_issue = ov["impact_by_issue"]
+    top_issue       = ov["top_issue"]
+    no_rows       = result_df.iloc[:0]
+    panel_stats   = run_aggs["panel_stats"]
 
     TAB_OV, TAB_MR, TAB_AA, TAB_AR, TAB_LG, TAB_FB = st.tabs([
         "📊  Overview",
@@ -1083,69 +1050,73 @@ if raw_df is not None:
     # ═════════════════════════════════════════════════════════════════════════
     with TAB_OV:
 
+        # Each section is one html element instead of a message per st.metric
         section_label("◈", "Run Summary")
-        k1, k2, k3, k4, k5 = st.columns(5)
-        k1.metric("Total Incidents",  total)
-        k2.metric("Escalated",        escalated_n,
-                  delta=f"{escalated_n/total:.0%} of batch",
-                  delta_color="inverse")
-        k3.metric("Total Exposure",   fmt_inr(total_impact))
-        k4.metric("Dominant Issue",   top_issue.replace("_"," ").title())
-        k5.metric("Avg Downtime",     f"{avg_downtime:.0f} min")
+        metric_grid([
+            MetricCard("Total Incidents", total),
+            MetricCard("Escalated",       escalated_n, f"{escalated_n/total:.0%} of batch", "inverse"),
+            MetricCard("Total Exposure",  fmt_inr(total_impact)),
+            MetricCard("Dominant Issue",  top_issue),
+            MetricCard("Avg Downtime",    f"{avg_downtime:.0f} min"),
+        ])
 
         section_label("🤖", "Automation Engine")
-        a1, a2, a3, a4, a5 = st.columns(5)
-        a1.metric("Auto-Resolved",
-                  auto_metrics.get("auto_resolved_count", 0),
-                  delta=f"{auto_metrics.get('auto_resolved_pct',0)}%",
-                  delta_color="normal")
-        a2.metric("Auto-Attempted",
-                  auto_metrics.get("auto_attempted_count", 0),
-                  delta=f"{auto_metrics.get('auto_attempted_pct',0)}% partial",
-                  delta_color="off")
-        a3.metric("Manual Required",
-                  auto_metrics.get("manual_required_count", 0),
-                  delta=f"{auto_metrics.get('manual_required_pct',0)}%",
-                  delta_color="inverse")
-        a4.metric("Avg Auto-Resolve", f"{auto_metrics.get('avg_auto_time_sec',0):.0f}s")
-        a5.metric("Manual Saved",     f"{auto_metrics.get('manual_reduction_pct',0):.1f}%",
-                  delta="vs 100% baseline", delta_color="normal")
+        metric_grid([
+            MetricCard("Auto-Resolved",
+                       auto_metrics.get("auto_resolved_count", 0),
+                       f"{auto_metrics.get('auto_resolved_pct',0)}%", "normal"),
+            MetricCard("Auto-Attempted",
+                       auto_metrics.get("auto_attempted_count", 0),
+                       f"{auto_metrics.get('auto_attempted_pct',0)}% partial", "off"),
+            MetricCard("Manual Required",
+                       auto_metrics.get("manual_required_count", 0),
+                       f"{auto_metrics.get('manual_required_pct',0)}%", "inverse"),
+            MetricCard("Avg Auto-Resolve", f"{auto_metrics.get('avg_auto_time_sec',0):.0f}s"),
+            MetricCard("Manual Saved",     f"{auto_metrics.get('manual_reduction_pct',0):.1f}%",
+                       "vs 100% baseline", "normal"),
+        ])
 
         section_label("◈", "Operational Intelligence")
-        b1, b2, b3, b4 = st.columns(4)
-        saved_min = auto_metrics.get("downtime_saved_minutes", 0)
-        b1.metric("Downtime Saved",
-                  f"{saved_min:,} min",
-                  delta=f"{saved_min/60:.1f} hrs",
-                  delta_color="normal",
-                  help="AUTO_RESOLVED count × 120 min manual baseline")
-        b2.metric("Revenue Contained",
-                  fmt_inr(auto_metrics.get("revenue_auto_contained", 0)),
-                  help="Sum of impact_score for AUTO_RESOLVED incidents")
-        b3.metric("Repeat ATMs",
-                  auto_metrics.get("repeat_atm_count", 0),
-                  delta="Flagged for review" if auto_metrics.get("repeat_atm_count",0) > 0 else "Clear",
-                  delta_color="inverse" if auto_metrics.get("repeat_atm_count",0) > 0 else "off")
-        b4.metric("Low-Confidence Flags",
-                  auto_metrics.get("low_confidence_count", 0),
-                  delta="Sent to manual" if auto_metrics.get("low_confidence_count",0) > 0 else "None",
-                  delta_color="inverse" if auto_metrics.get("low_confidence_count",0) > 0 else "off",
-                  help=f"Predictions below {confidence_threshold:.0%} threshold")
+        saved_min  = auto_metrics.get("downtime_saved_minutes", 0)
+        repeat_n   = auto_metrics.get("repeat_atm_count", 0)
+        low_conf_n = auto_metrics.get("low_confidence_count", 0)
+        metric_grid([
+            MetricCard("Downtime Saved", f"{saved_min:,} min", f"{saved_min/60:.1f} hrs", "normal",
+                       help="AUTO_RESOLVED count × 120 min manual baseline"),
+            MetricCard("Revenue Contained", fmt_inr(auto_metrics.get("revenue_auto_contained", 0)),
+                       delta_color="off",
+                       help="Sum of impact_score for AUTO_RESOLVED incidents"),
+            MetricCard("Repeat ATMs", repeat_n,
+                       "Flagged for review" if repeat_n > 0 else "Clear",
+                       "inverse" if repeat_n > 0 else "off"),
+            MetricCard("Low-Confidence Flags", low_conf_n,
+                       "Sent to manual" if low_conf_n > 0 else "None",
+                       "inverse" if low_conf_n > 0 else "off",
+                       help=f"Predictions below {confidence_threshold:.0%} threshold"),
+        ])
 
         # Repeat ATM table
         if not repeat_df.empty:
             section_label("⚠", "Repeat ATM Incidents Detected")
-            repeat_rows = []
-            for _, r in repeat_df.iterrows():
-                atm_rows = result_df[result_df["atm_id"] == r["atm_id"]]
-                repeat_rows.append({
-                    "ATM ID":       r["atm_id"],
-                    "# Incidents":  r["incident_count"],
-                    "Issue Types":  ", ".join(atm_rows["predicted_issue"].str.replace("_"," ").str.title().unique()),
-                    "Modes":        ", ".join(atm_rows["resolution_mode"].unique()),
-                    "Total Impact": fmt_inr(atm_rows["impact_score"].sum()),
-                })
-            st.dataframe(pd.DataFrame(repeat_rows), use_container_width=True, hide_index=True)
+            repeat_rows = result_df[result_df["atm_id"].isin(repeat_df["atm_id"].to_numpy())]
+            # atm_id is categorical: observed=True keeps the pass to the repeat
+            # ATMs instead of one (empty) group per ATM in the run on pandas 2.x
+            per_atm = repeat_rows.groupby("atm_id", observed=True, sort=False).agg(
+                issues=("issue_label",     lambda s: ", ".join(s.unique())),
+                modes=("resolution_mode",  lambda s: ", ".join(s.unique())),
+                total_impact=("impact_score", "sum"),
+            )
+            merged = repeat_df.merge(per_atm, left_on="atm_id", right_index=True, how="left")
+            st.dataframe(
+                pd.DataFrame({
+                    "ATM ID":       merged["atm_id"],
+                    "# Incidents":  merged["incident_count"],
+                    "Issue Types":  merged["issues"],
+                    "Modes":        merged["modes"],
+                    "Total Impact": fmt_inr_array(merged["total_impact"]),
+                }),
+                use_container_width=True, hide_index=True,
+            )
 
         # Charts
         section_label("◈", "Distribution Analytics")
@@ -1153,44 +1124,30 @@ if raw_df is not None:
 
         with ch1:
             st.markdown('<div class="pg-chart-card">', unsafe_allow_html=True)
-            st.markdown('<div class="pg-chart-title">Incidents by Issue Type</div>', unsafe_allow_html=True)
-            ic = result_df["predicted_issue"].value_counts().reset_index()
-            ic.columns = ["Issue", "Count"]
-            st.bar_chart(ic.set_index("Issue"), height=195, color="#3d8ef0")
+            st.html('<div class="pg-chart-title">Incidents by Issue Type</div>')
+            ic = issue_counts.rename_axis("Issue").to_frame("Count")
+            st.bar_chart(ic, height=195, color="#3d8ef0")
             st.markdown('</div>', unsafe_allow_html=True)
 
         with ch2:
             st.markdown('<div class="pg-chart-card">', unsafe_allow_html=True)
-            st.markdown('<div class="pg-chart-title">Financial Exposure by Issue Type (₹)</div>', unsafe_allow_html=True)
-            imp = (result_df.groupby("predicted_issue")["impact_score"]
-                   .sum().sort_values(ascending=False).reset_index())
-            imp.columns = ["Issue", "Impact"]
-            st.bar_chart(imp.set_index("Issue"), height=195, color="#c8a84b")
+            st.html('<div class="pg-chart-title">Financial Exposure by Issue Type (₹)</div>')
+            imp = impact_by_issue.rename_axis("Issue").to_frame("Impact")
+            st.bar_chart(imp, height=195, color="#c8a84b")
             st.markdown('</div>', unsafe_allow_html=True)
 
         with ch3:
             st.markdown('<div class="pg-chart-card">', unsafe_allow_html=True)
-            st.markdown('<div class="pg-chart-title">Resolution Mode Split</div>', unsafe_allow_html=True)
-            mode_order = {"MANUAL_REQUIRED": 0, "AUTO_ATTEMPTED": 1, "AUTO_RESOLVED": 2}
-            mc = result_df["resolution_mode"].value_counts().reset_index()
-            mc.columns = ["Mode", "Count"]
-            mc["_o"] = mc["Mode"].map(mode_order).fillna(3)
-            mc = mc.sort_values("_o").drop(columns=["_o"])
-            st.bar_chart(mc.set_index("Mode"), height=195, color="#34c77b")
+            st.html('<div class="pg-chart-title">Resolution Mode Split</div>')
+            mc = mode_counts[mode_counts > 0].rename_axis("Mode").to_frame("Count")
+            st.bar_chart(mc, height=195, color="#34c77b")
             st.markdown('</div>', unsafe_allow_html=True)
 
         # Export
         section_label("⬇", "Export")
-        dl_cols = [
-            "atm_id", "location", "predicted_issue", "ml_confidence",
-            "impact_score", "downtime_minutes", "resolution_mode",
-            "recommended_action", "responsible_team", "sla_minutes",
-            "escalation_status", "eligibility_reason", "automation_log",
-        ]
-        csv_out = result_df[[c for c in dl_cols if c in result_df.columns]].to_csv(index=False)
         st.download_button(
             "⬇  Download Full Results (CSV)",
-            csv_out, file_name="payguard_results.csv", mime="text/csv",
+            run_aggs["results_csv"], file_name="payguard_results.csv", mime="text/csv",
         )
 
     # ═════════════════════════════════════════════════════════════════════════
@@ -1199,7 +1156,7 @@ if raw_df is not None:
     with TAB_MR:
         st.caption("Incidents that require immediate human intervention — escalated, high-impact, or ineligible for automation.")
         render_mode_panel(
-            result_df, "MANUAL_REQUIRED",
+            mode_groups.get("MANUAL_REQUIRED", no_rows), panel_stats["MANUAL_REQUIRED"],
             color="red", icon="🔴",
             title="MANUAL REQUIRED — Human Intervention Needed",
         )
@@ -1210,7 +1167,7 @@ if raw_df is not None:
     with TAB_AA:
         st.caption("Automation was triggered and executed but did not fully resolve the issue. Routed to the responsible team with full diagnostic context.")
         render_mode_panel(
-            result_df, "AUTO_ATTEMPTED",
+            mode_groups.get("AUTO_ATTEMPTED", no_rows), panel_stats["AUTO_ATTEMPTED"],
             color="amber", icon="🟡",
             title="AUTO ATTEMPTED — Partial Automation, Human Handoff",
             avg_time_label="Avg Attempt Time",
@@ -1222,7 +1179,7 @@ if raw_df is not None:
     with TAB_AR:
         st.caption("Fully automated remediation. Closed by the automation engine. No human intervention required.")
         render_mode_panel(
-            result_df, "AUTO_RESOLVED",
+            mode_groups.get("AUTO_RESOLVED", no_rows), panel_stats["AUTO_RESOLVED"],
             color="green", icon="🟢",
             title="AUTO RESOLVED — System Remediated Successfully",
             avg_time_label="Avg Resolve Time",
@@ -1232,129 +1189,19 @@ if raw_df is not None:
     #  LOG ARCHIVE TAB
     # ═════════════════════════════════════════════════════════════════════════
     with TAB_LG:
-        section_label("📁", "Persistent Automation Log Archive")
-        log_df = load_logs()
-
-        if log_df.empty:
-            st.markdown(
-                '<div class="pg-empty-state"><span class="pg-empty-icon">📭</span>'
-                'No log records yet. Run an analysis to populate the archive.</div>',
-                unsafe_allow_html=True,
-            )
-        else:
-            lk1, lk2, lk3, lk4 = st.columns(4)
-            lk1.metric("Total Records",   f"{len(log_df):,}")
-            lk2.metric("Auto-Resolved",   f"{(log_df['resolution_mode']=='AUTO_RESOLVED').sum():,}")
-            lk3.metric("Auto-Attempted",  f"{(log_df['resolution_mode']=='AUTO_ATTEMPTED').sum():,}")
-            lk4.metric("Manual Required", f"{(log_df['resolution_mode']=='MANUAL_REQUIRED').sum():,}")
-
-            st.markdown("<div style='height:0.4rem'></div>", unsafe_allow_html=True)
-            fc, _ = st.columns([2, 3])
-            with fc:
-                filter_mode = st.selectbox(
-                    "Filter by mode",
-                    ["All", "AUTO_RESOLVED", "AUTO_ATTEMPTED", "MANUAL_REQUIRED"],
-                    key="log_filter",
-                )
-            view_df = log_df if filter_mode == "All" else log_df[log_df["resolution_mode"] == filter_mode]
-            disp = view_df[[
-                "timestamp", "atm_id", "predicted_issue", "impact_score",
-                "resolution_mode", "auto_resolution_time_sec", "eligibility_reason",
-            ]].copy()
-            disp["impact_score"] = disp["impact_score"].apply(lambda x: f"₹{x:,.0f}")
-            disp = disp.rename(columns={
-                "timestamp": "Timestamp", "atm_id": "ATM ID",
-                "predicted_issue": "Issue", "impact_score": "Impact",
-                "resolution_mode": "Mode",
-                "auto_resolution_time_sec": "Auto Time (s)",
-                "eligibility_reason": "Automation Gate",
-            })
-            st.dataframe(disp.tail(50), use_container_width=True, hide_index=True, height=400)
-            st.download_button(
-                "⬇  Download Full Log Archive (CSV)",
-                log_df.to_csv(index=False),
-                file_name="payguard_automation_logs.csv", mime="text/csv",
-            )
+        render_log_archive_tab()
 
     # ═════════════════════════════════════════════════════════════════════════
     #  FEEDBACK TAB
     # ═════════════════════════════════════════════════════════════════════════
     with TAB_FB:
-        section_label("🔁", "Technician Feedback Loop")
-        st.caption("Submit corrections to improve model accuracy over time. Feedback is written to data/feedback.csv.")
-
-        result_df_saved = st.session_state.get("result_df", None)
-
-        if result_df_saved is None:
-            st.markdown(
-                '<div class="pg-empty-state"><span class="pg-empty-icon">📋</span>'
-                'Run an analysis first to enable feedback submission.</div>',
-                unsafe_allow_html=True,
-            )
-        else:
-            feedback_candidates = result_df_saved[
-                result_df_saved["resolution_mode"].isin(["MANUAL_REQUIRED", "AUTO_ATTEMPTED"])
-            ]
-            if feedback_candidates.empty:
-                feedback_candidates = result_df_saved
-
-            fb_col1, fb_col2 = st.columns(2)
-
-            with fb_col1:
-                section_label("◈", "Select Incident")
-                fb_atm  = st.selectbox("ATM ID", feedback_candidates["atm_id"].tolist(), key="fb_atm_select")
-                matched = feedback_candidates[feedback_candidates["atm_id"] == fb_atm].iloc[0]
-                st.markdown(
-                    f"""
-                    <div class="pg-form-card">
-                      <div class="pg-form-label">Predicted Issue</div>
-                      <div class="pg-form-value">{matched['predicted_issue'].replace('_',' ').title()}</div>
-                      <div class="pg-form-label">Resolution Mode</div>
-                      <div class="pg-form-value">{matched['resolution_mode']}</div>
-                      <div class="pg-form-label">ML Confidence</div>
-                      <div class="pg-form-value">{matched.get('ml_confidence', 1.0):.1%}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
-
-            with fb_col2:
-                section_label("◈", "Technician Assessment")
-                ISSUE_TYPES = ["network_failure","card_declined","hardware_fault","cash_out","auth_timeout"]
-                fb_actual   = st.selectbox(
-                    "Actual Issue Diagnosed", ISSUE_TYPES,
-                    index=ISSUE_TYPES.index(matched["predicted_issue"])
-                          if matched["predicted_issue"] in ISSUE_TYPES else 0,
-                    key="fb_actual",
-                )
-                fb_helpful  = st.radio(
-                    "Was recommended action helpful?",
-                    ["yes","partial","no"], horizontal=True, key="fb_helpful",
-                )
-                fb_res_time = st.number_input("Resolution Time (min)", 0, 600, 30, key="fb_res")
-                fb_notes    = st.text_area("Notes (optional)", key="fb_notes", height=80)
-                if st.button("✅  Submit Feedback", type="primary"):
-                    save_feedback(
-                        atm_id=fb_atm,
-                        predicted_issue=matched["predicted_issue"],
-                        technician_actual_issue=fb_actual,
-                        action_helpful=fb_helpful,
-                        technician_notes=fb_notes,
-                        resolution_time_minutes=fb_res_time,
-                    )
-                    st.success("Feedback recorded successfully.")
-                    st.rerun()
-
-        feedback_df = load_feedback()
-        if not feedback_df.empty:
-            section_label("◈", "Feedback History (last 20)")
-            st.dataframe(feedback_df.tail(20), use_container_width=True, hide_index=True, height=280)
+        render_feedback_tab()
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  IDLE STATE
 # ─────────────────────────────────────────────────────────────────────────────
 else:
-    st.markdown(
+    st.html(
         """
         <div class="pg-empty-state" style="margin-top:1.5rem; padding:4rem 2rem;">
           <span class="pg-empty-icon">🛡️</span>
@@ -1366,6 +1213,5 @@ else:
             CLASSIFY &nbsp;·&nbsp; SCORE &nbsp;·&nbsp; ESCALATE &nbsp;·&nbsp; AUTOMATE &nbsp;·&nbsp; LOG
           </div>
         </div>
-        """,
-        unsafe_allow_html=True,
+        """
     )
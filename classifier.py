@@ -8,14 +8,17 @@ import os
 import pickle
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, accuracy_score
+
+# scikit-learn (~1s to import) is only needed for training; prediction works
+# on the unpickled estimator, so the sklearn imports live inside train().
 
 MODEL_PATH = "model/classifier.pkl"
 ENCODER_PATH = "model/label_encoder.pkl"
 
+# In-process copy of the unpickled artifacts, shared by every caller (and every
+# Streamlit session) until the files on disk change: (stamp, artifacts)
+_loaded_model = None
+
 # Features used for training (no target, no IDs)
 FEATURE_COLS = [
     "hour_of_day",
@@ -27,13 +30,22 @@ FEATURE_COLS = [
 ]
 
 
+def encode_error_codes(error_codes, code_map: dict) -> np.ndarray:
+    """
+    Ordinal-encode error codes with a persisted code_map ({code: index}).
+    Categorical codes do the lookup in one vectorised pass; unknown codes → -1.
+    """
+    categories = sorted(code_map, key=code_map.get)
+    return pd.Categorical(error_codes, categories=categories).codes
+
+
 def encode_features(df: pd.DataFrame) -> pd.DataFrame:
     """Add encoded error_code column."""
     df = df.copy()
     # Simple ordinal encoding for error_code
     unique_codes = sorted(df["error_code"].unique())
     code_map = {code: idx for idx, code in enumerate(unique_codes)}
-    df["error_code_encoded"] = df["error_code"].map(code_map).fillna(-1).astype(int)
+    df["error_code_encoded"] = encode_error_codes(df["error_code"], code_map)
     return df, code_map
 
 
@@ -46,13 +58,19 @@ def train(df: pd.DataFrame, random_state: int | None = 42) -> dict:
                       Pass 42  (default) for Stable Demo Mode — fully deterministic.
                       Pass None         for Live Simulation Mode — true randomness.
     """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+    from sklearn.metrics import classification_report, accuracy_score
+
     os.makedirs("model", exist_ok=True)
 
     df, code_map = encode_features(df)
 
     le = LabelEncoder()
     y = le.fit_transform(df["issue_type"])
-    X = df[FEATURE_COLS].values
+    # The forest casts to float32 internally; handing it float32 skips that copy
+    X = df[FEATURE_COLS].to_numpy(dtype=np.float32)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=random_state, stratify=y
@@ -63,6 +81,7 @@ def train(df: pd.DataFrame, random_state: int | None = 42) -> dict:
         max_depth=10,
         random_state=random_state,
         class_weight="balanced",
+        n_jobs=-1,              # trees fit / evaluate independently → all cores
     )
     clf.fit(X_train, y_train)
 
@@ -75,6 +94,8 @@ def train(df: pd.DataFrame, random_state: int | None = 42) -> dict:
         pickle.dump({"model": clf, "code_map": code_map}, f)
     with open(ENCODER_PATH, "wb") as f:
         pickle.dump(le, f)
+    global _loaded_model
+    _loaded_model = None        # next load_model() picks up the new artifacts
 
     print(f"Training complete | Accuracy: {acc:.3f}")
     print(report)
@@ -82,12 +103,21 @@ def train(df: pd.DataFrame, random_state: int | None = 42) -> dict:
 
 
 def load_model():
-    """Load persisted model artifacts."""
-    with open(MODEL_PATH, "rb") as f:
-        bundle = pickle.load(f)
-    with open(ENCODER_PATH, "rb") as f:
-        le = pickle.load(f)
-    return bundle["model"], bundle["code_map"], le
+    """
+    Load persisted model artifacts.
+    Unpickled once and reused until a retrain rewrites the files.
+    """
+    global _loaded_model
+    stamp = (os.stat(MODEL_PATH).st_mtime_ns, os.stat(ENCODER_PATH).st_mtime_ns)
+    if _loaded_model is None or _loaded_model[0] != stamp:
+        with open(MODEL_PATH, "rb") as f:
+            bundle = pickle.load(f)
+        with open(ENCODER_PATH, "rb") as f:
+            le = pickle.load(f)
+        # Models persisted before n_jobs was set predict on one core otherwise
+        bundle["model"].n_jobs = -1
+        _loaded_model = (stamp, (bundle["model"], bundle["code_map"], le))
+    return _loaded_model[1]
 
 
 def predict_single(row: dict) -> str:
@@ -101,19 +131,14 @@ def predict_single(row: dict) -> str:
         row["downtime_minutes"],
         row["complaint_count"],
         code_enc,
-    ]])
+    ]], dtype=np.float32)
     pred_idx = clf.predict(features)[0]
     return le.inverse_transform([pred_idx])[0]
 
 
 def predict_batch(df: pd.DataFrame) -> pd.Series:
     """Predict issue types for a DataFrame."""
-    clf, code_map, le = load_model()
-    df2 = df.copy()
-    df2["error_code_encoded"] = df2["error_code"].map(code_map).fillna(-1).astype(int)
-    X = df2[FEATURE_COLS].values
-    preds = clf.predict(X)
-    return pd.Series(le.inverse_transform(preds), index=df.index, name="predicted_issue")
+    return predict_batch_with_confidence(df)["predicted_issue"]
 
 
 def predict_batch_with_confidence(df: pd.DataFrame) -> pd.DataFrame:
@@ -129,18 +154,21 @@ def predict_batch_with_confidence(df: pd.DataFrame) -> pd.DataFrame:
     automation engine, regardless of impact/downtime eligibility.
     """
     clf, code_map, le = load_model()
-    df2 = df.copy()
-    df2["error_code_encoded"] = df2["error_code"].map(code_map).fillna(-1).astype(int)
-    X = df2[FEATURE_COLS].values
+    X = df.assign(
+        error_code_encoded=encode_error_codes(df["error_code"], code_map)
+    )[FEATURE_COLS].to_numpy(dtype=np.float32)     # the forest's native dtype
 
-    preds      = clf.predict(X)
+    # One forest traversal: the label is the argmax class, exactly what
+    # clf.predict() would return, and its probability is the confidence.
     proba      = clf.predict_proba(X)    # shape: (n_rows, n_classes)
-    confidence = proba.max(axis=1)       # highest class probability per row
+    pred_idx   = proba.argmax(axis=1)
+    preds      = clf.classes_.take(pred_idx)
+    confidence = proba[np.arange(len(X)), pred_idx]   # highest class probability per row
 
     return pd.DataFrame(
         {
             "predicted_issue": le.inverse_transform(preds),
-            "ml_confidence":   np.round(confidence, 4),
+            "ml_confidence":   confidence,   # unrounded: only compared to a threshold
         },
         index=df.index,
     )
@@ -23,49 +23,29 @@ ERROR_CODES = {
 
 ISSUE_TYPES = list(ERROR_CODES.keys())
 
+# Pattern-based synthetic ranges per issue type (integer ranges inclusive):
+#   volume, avg_amount (uniform), downtime, complaints
+ISSUE_RANGES = {
+    "network_failure": {"volume": (10, 80),  "avg_amt": (500, 3000),  "downtime": (15, 120), "complaints": (3, 20)},
+    "card_declined":   {"volume": (50, 200), "avg_amt": (200, 1500),  "downtime": (0, 10),   "complaints": (5, 30)},
+    "hardware_fault":  {"volume": (5, 50),   "avg_amt": (1000, 5000), "downtime": (60, 480), "complaints": (10, 40)},
+    "cash_out":        {"volume": (80, 300), "avg_amt": (2000, 8000), "downtime": (30, 240), "complaints": (15, 60)},
+    "auth_timeout":    {"volume": (20, 100), "avg_amt": (300, 2000),  "downtime": (5, 45),   "complaints": (2, 15)},
+}
+
 
 def generate_row(issue_type: str) -> dict:
     """Generate a single synthetic record for a given issue type."""
-    hour = random.randint(0, 23)
-    
-    # Pattern-based synthetic logic per issue type
-    if issue_type == "network_failure":
-        volume     = random.randint(10, 80)
-        avg_amt    = random.uniform(500, 3000)
-        downtime   = random.randint(15, 120)
-        complaints = random.randint(3, 20)
-    elif issue_type == "card_declined":
-        volume     = random.randint(50, 200)
-        avg_amt    = random.uniform(200, 1500)
-        downtime   = random.randint(0, 10)
-        complaints = random.randint(5, 30)
-    elif issue_type == "hardware_fault":
-        volume     = random.randint(5, 50)
-        avg_amt    = random.uniform(1000, 5000)
-        downtime   = random.randint(60, 480)
-        complaints = random.randint(10, 40)
-    elif issue_type == "cash_out":
-        volume     = random.randint(80, 300)
-        avg_amt    = random.uniform(2000, 8000)
-        downtime   = random.randint(30, 240)
-        complaints = random.randint(15, 60)
-    else:  # auth_timeout
-        volume     = random.randint(20, 100)
-        avg_amt    = random.uniform(300, 2000)
-        downtime   = random.randint(5, 45)
-        complaints = random.randint(2, 15)
-
-    error_code = random.choice(ERROR_CODES[issue_type])
-
+    r = ISSUE_RANGES[issue_type]
     return {
         "atm_id":            f"ATM-{random.randint(1000, 9999)}",
         "location":          random.choice(LOCATIONS),
-        "hour_of_day":       hour,
-        "transaction_volume": volume,
-        "avg_amount":        round(avg_amt, 2),
-        "downtime_minutes":  downtime,
-        "complaint_count":   complaints,
-        "error_code":        error_code,
+        "hour_of_day":       random.randint(0, 23),
+        "transaction_volume": random.randint(*r["volume"]),
+        "avg_amount":        round(random.uniform(*r["avg_amt"]), 2),
+        "downtime_minutes":  random.randint(*r["downtime"]),
+        "complaint_count":   random.randint(*r["complaints"]),
+        "error_code":        random.choice(ERROR_CODES[issue_type]),
         "issue_type":        issue_type,
     }
 
@@ -80,23 +60,44 @@ def generate_dataset(n_samples: int = 1000, seed: int | None = 42) -> pd.DataFra
                    Pass 42   (default) for Stable Demo Mode — identical output every run.
                    Pass None           for Live Simulation Mode — different output each run.
     """
-    if seed is not None:
-        random.seed(seed)
-        np.random.seed(seed)
-    # If seed is None the global RNG state is used as-is (true randomness).
+    # Seeded generator → identical batch; seed=None → fresh OS entropy each call.
+    rng = np.random.default_rng(seed)
 
-    rows = []
+    # Balanced class blocks, then the remainder cycling through the issue types
     per_class = n_samples // len(ISSUE_TYPES)
-    for issue in ISSUE_TYPES:
-        for _ in range(per_class):
-            rows.append(generate_row(issue))
-
-    # Fill remainder
-    for i in range(n_samples - len(rows)):
-        rows.append(generate_row(ISSUE_TYPES[i % len(ISSUE_TYPES)]))
-
-    random.shuffle(rows)
-    return pd.DataFrame(rows)
+    issue_idx = np.concatenate([
+        np.repeat(np.arange(len(ISSUE_TYPES)), per_class),
+        np.arange(n_samples - per_class * len(ISSUE_TYPES)) % len(ISSUE_TYPES),
+    ])
+    rng.shuffle(issue_idx)
+
+    # Per-row bounds gathered from the per-issue table, then one draw per column
+    def bounds(field):
+        lo, hi = np.array([ISSUE_RANGES[i][field] for i in ISSUE_TYPES]).T
+        return lo[issue_idx], hi[issue_idx]
+
+    def ints(field):
+        return rng.integers(*bounds(field), endpoint=True)
+
+    amt_lo, amt_hi = bounds("avg_amt")
+
+    # Error code: uniform pick among each row's issue-specific codes
+    code_counts = [len(ERROR_CODES[i]) for i in ISSUE_TYPES]
+    all_codes   = np.array([c for i in ISSUE_TYPES for c in ERROR_CODES[i]])
+    offsets     = np.cumsum([0] + code_counts[:-1])[issue_idx]
+    code_pick   = offsets + rng.integers(0, np.array(code_counts)[issue_idx])
+
+    return pd.DataFrame({
+        "atm_id":             np.char.add("ATM-", rng.integers(1000, 10000, n_samples).astype(str)),
+        "location":           np.array(LOCATIONS)[rng.integers(0, len(LOCATIONS), n_samples)],
+        "hour_of_day":        rng.integers(0, 24, n_samples),
+        "transaction_volume": ints("volume"),
+        "avg_amount":         np.round(rng.uniform(amt_lo, amt_hi), 2),
+        "downtime_minutes":   ints("downtime"),
+        "complaint_count":    ints("complaints"),
+        "error_code":         all_codes[code_pick],
+        "issue_type":         np.array(ISSUE_TYPES)[issue_idx],
+    })
 
 
 if __name__ == "__main__":
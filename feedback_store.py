@@ -34,18 +34,17 @@ def _ensure_file():
             writer.writeheader()
 
 
-def save_feedback(
+def make_feedback_record(
     atm_id: str,
     predicted_issue: str,
     technician_actual_issue: str,
     action_helpful: str = "yes",
     technician_notes: str = "",
     resolution_time_minutes: int = 0,
-) -> None:
-    """Append a technician feedback record."""
-    _ensure_file()
+) -> dict:
+    """Build one feedback row (timestamped now) in the COLUMNS schema."""
     prediction_correct = "yes" if predicted_issue == technician_actual_issue else "no"
-    record = {
+    return {
         "timestamp":                 datetime.datetime.now().isoformat(),
         "atm_id":                    atm_id,
         "predicted_issue":           predicted_issue,
@@ -55,9 +54,35 @@ def save_feedback(
         "technician_notes":          technician_notes,
         "resolution_time_minutes":   resolution_time_minutes,
     }
+
+
+def save_feedback_batch(records: list[dict]) -> int:
+    """
+    Append many feedback records with a single open/write/close.
+    Records are dicts from make_feedback_record(). Returns the number written.
+    """
+    if not records:
+        return 0
+    _ensure_file()
     with open(FEEDBACK_PATH, "a", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=COLUMNS)
-        writer.writerow(record)
+        writer.writerows(records)
+    return len(records)
+
+
+def save_feedback(
+    atm_id: str,
+    predicted_issue: str,
+    technician_actual_issue: str,
+    action_helpful: str = "yes",
+    technician_notes: str = "",
+    resolution_time_minutes: int = 0,
+) -> None:
+    """Append a technician feedback record."""
+    save_feedback_batch([make_feedback_record(
+        atm_id, predicted_issue, technician_actual_issue,
+        action_helpful, technician_notes, resolution_time_minutes,
+    )])
     print(f"Feedback saved for {atm_id}")
 
 
@@ -70,9 +95,10 @@ def load_feedback() -> pd.DataFrame:
     return df
 
 
-def get_accuracy_summary() -> dict:
-    """Compute simple accuracy stats from feedback."""
-    df = load_feedback()
+def get_accuracy_summary(df: pd.DataFrame | None = None) -> dict:
+    """Compute simple accuracy stats from feedback (optionally from a loaded frame)."""
+    if df is None:
+        df = load_feedback()
     if df.empty:
         return {"total": 0, "correct": 0, "accuracy": None}
     total   = len(df)
@@ -18,17 +18,46 @@ Schema (fixed, do not modify):
 Design rules:
   - Auto-creates the file and parent directory on first write
   - Always appends — never overwrites historical records
+  - Appends and running-total rewrites are serialised by one lock
   - Returns empty DataFrame (correct columns) when file is missing or empty
-  - No external dependencies beyond pandas + stdlib
+  - No required dependencies beyond pandas + stdlib (pyarrow's multithreaded
+    CSV reader is used for loads when it is installed)
 """
 
 import os
 import csv
+import json
 import datetime
+import tempfile
+import threading
+from contextlib import contextmanager
 import pandas as pd
 
+try:                        # POSIX: advisory lock shared with other processes
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:                        # optional: multithreaded block-wise CSV parsing
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
 LOG_PATH = "data/automation_logs.csv"
 
+# The resolution_mode vocabulary, in triage order — MANUAL_REQUIRED first,
+# AUTO_RESOLVED last. Owned by the storage schema; automation_engine imports it.
+RESOLUTION_MODES = ("MANUAL_REQUIRED", "AUTO_ATTEMPTED", "AUTO_RESOLVED")
+
+# Running totals for get_log_summary(), kept beside the log and updated on
+# every append. Valid only while its recorded stamp matches LOG_PATH.
+SUMMARY_PATH = "data/automation_logs.summary.json"
+
+# Held across every append and every SUMMARY_PATH rewrite (see _log_lock)
+LOCK_PATH = "data/automation_logs.lock"
+_thread_lock = threading.Lock()
+
 LOG_COLUMNS = [
     "timestamp",
     "atm_id",
@@ -40,6 +69,13 @@ LOG_COLUMNS = [
     "automation_log",
 ]
 
+# Size of a log file holding only its header row (csv's default "\r\n" ending)
+_HEADER_BYTES = len(",".join(LOG_COLUMNS)) + 2
+
+# Parsed copies of the log file, per requested column set, reused until the
+# file changes on disk: {columns: ((mtime_ns, size), frame)}
+_loaded_logs = {}
+
 
 # ── Private helpers ───────────────────────────────────────────────────────────
 
@@ -52,8 +88,189 @@ def _ensure_file() -> None:
             writer.writeheader()
 
 
+def _log_stamp() -> list[int]:
+    st = os.stat(LOG_PATH)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _count_rows(modes, times) -> dict:
+    """Summary counters for parallel sequences of modes and auto times."""
+    counters = {"total": 0, "AUTO_RESOLVED": 0, "AUTO_ATTEMPTED": 0,
+                "MANUAL_REQUIRED": 0, "resolved_time_sum": 0.0}
+    for mode, t in zip(modes, times):
+        counters["total"] += 1
+        if mode in counters:
+            counters[mode] += 1
+        if mode == "AUTO_RESOLVED":
+            counters["resolved_time_sum"] += float(t)
+    return counters
+
+
+def _read_summary() -> dict | None:
+    """Sidecar counters if they describe the log file as it is now, else None."""
+    try:
+        with open(SUMMARY_PATH, encoding="utf-8") as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return summary if summary.get("stamp") == _log_stamp() else None
+
+
+@contextmanager
+def _log_lock():
+    """
+    Serialise log appends and sidecar rewrites: a thread lock for the sessions
+    of this process, plus an flock on LOCK_PATH for other processes (POSIX).
+    """
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(LOCK_PATH), exist_ok=True)
+        with open(LOCK_PATH, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _drop_summary() -> None:
+    """Delete the sidecar so the next get_log_summary() rebuilds it from the log."""
+    try:
+        os.remove(SUMMARY_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def _write_summary(counters: dict) -> None:
+    """Persist counters stamped with the log file's current state (atomic replace)."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(SUMMARY_PATH), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({**counters, "stamp": _log_stamp()}, f)
+    os.replace(tmp, SUMMARY_PATH)
+
+
 # ── Public API ────────────────────────────────────────────────────────────────
 
+class LogSink:
+    """
+    Collects a run of appends and writes them with one open, one cached
+    csv.writer and one running-totals update:
+
+        with LogSink() as sink:
+            sink.append(...)          # as many times as needed
+            sink.append_many(df)
+
+    Nothing touches the disk while the block runs. On a clean exit the log
+    lock is taken only for the write itself: read the totals, append every
+    pending row, save the totals. If the block raises, the pending rows are
+    dropped and neither file is touched.
+    """
+
+    def __enter__(self) -> "LogSink":
+        # Batches in call order: lists of row tuples (append) and frames (append_many)
+        self._pending = []
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and self._pending:
+            self._flush()
+
+    def _flush(self) -> None:
+        added = _count_rows((), ())
+        for batch in self._pending:
+            if isinstance(batch, list):
+                counts = _count_rows((r[4] for r in batch), (r[6] for r in batch))
+            else:
+                counts = _count_rows(batch["resolution_mode"], batch["auto_resolution_time_sec"])
+            for key, value in counts.items():
+                added[key] += value
+
+        with _log_lock():
+            _ensure_file()
+            summary = _read_summary()   # must be read before the append moves the stamp
+            try:
+                with open(LOG_PATH, "a", newline="", encoding="utf-8", buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    for batch in self._pending:
+                        if isinstance(batch, list):
+                            writer.writerows(batch)
+                        else:
+                            # "\r\n" matches the csv.writer rows
+                            batch.to_csv(f, header=False, index=False, lineterminator="\r\n")
+            except BaseException:
+                # Part of the batch may have reached the file: count nothing
+                # and let the next get_log_summary() rescan
+                _drop_summary()
+                raise
+            finally:
+                _loaded_logs.clear()    # next load_logs() re-parses the grown file
+            if summary is None:
+                # No trustworthy running totals: the next get_log_summary() rescans
+                return
+            for key, value in added.items():
+                summary[key] += value
+            _write_summary(summary)
+
+    def append(
+        self,
+        atm_id: str,
+        predicted_issue: str,
+        impact_score: float,
+        resolution_mode: str,
+        eligibility_reason: str,
+        auto_resolution_time_sec: float,
+        automation_log: str,
+    ) -> None:
+        """Queue one record (timestamped now) as a positional row tuple."""
+        row = (
+            datetime.datetime.now().isoformat(timespec="seconds"),
+            atm_id,
+            predicted_issue,
+            round(float(impact_score), 2),
+            resolution_mode,
+            eligibility_reason,
+            round(float(auto_resolution_time_sec), 1),
+            automation_log,
+        )
+        if self._pending and isinstance(self._pending[-1], list):
+            self._pending[-1].append(row)
+        else:
+            self._pending.append([row])
+
+    def append_many(self, df: pd.DataFrame) -> int:
+        """
+        Queue every row of a pipeline result DataFrame; see
+        append_logs_from_dataframe() for the expected columns.
+        Returns the number of rows queued.
+
+        All rows share one timestamp (the call time) and are formatted and
+        written by pandas' C CSV writer in a single to_csv call.
+        """
+        n = len(df)
+
+        def text(name):
+            return df[name].astype(str) if name in df.columns else [""] * n
+
+        def number(name, decimals):
+            if name not in df.columns:
+                return [0.0] * n
+            return df[name].astype("float64").round(decimals)
+
+        self._pending.append(pd.DataFrame({
+            "timestamp":                datetime.datetime.now().isoformat(timespec="seconds"),
+            "atm_id":                   text("atm_id"),
+            "predicted_issue":          text("predicted_issue"),
+            "impact_score":             number("impact_score", 2),
+            "resolution_mode":          text("resolution_mode"),
+            "eligibility_reason":       text("eligibility_reason"),
+            "auto_resolution_time_sec": number("auto_resolution_time_sec", 1),
+            "automation_log":           text("automation_log"),
+        }, index=df.index))
+        return n
+
+
 def append_log(
     atm_id: str,
     predicted_issue: str,
@@ -66,21 +283,13 @@ def append_log(
     """
     Append a single automation result record to the CSV.
     Called once per incident after the automation engine finishes.
+    For many records in a row, hold a LogSink open instead.
     """
-    _ensure_file()
-    record = {
-        "timestamp":                  datetime.datetime.now().isoformat(timespec="seconds"),
-        "atm_id":                     atm_id,
-        "predicted_issue":            predicted_issue,
-        "impact_score":               round(float(impact_score), 2),
-        "resolution_mode":            resolution_mode,
-        "eligibility_reason":         eligibility_reason,
-        "auto_resolution_time_sec":   round(float(auto_resolution_time_sec), 1),
-        "automation_log":             automation_log,
-    }
-    with open(LOG_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=LOG_COLUMNS)
-        writer.writerow(record)
+    with LogSink() as sink:
+        sink.append(
+            atm_id, predicted_issue, impact_score, resolution_mode,
+            eligibility_reason, auto_resolution_time_sec, automation_log,
+        )
 
 
 def append_logs_from_dataframe(df: pd.DataFrame) -> int:
@@ -90,71 +299,139 @@ def append_logs_from_dataframe(df: pd.DataFrame) -> int:
         atm_id, predicted_issue, impact_score, resolution_mode,
         eligibility_reason (optional), auto_resolution_time_sec, automation_log
 
-    Returns the number of rows written.
+    Returns the number of rows written; an empty frame never opens the file.
     """
+    if df.empty:
+        return 0
+    with LogSink() as sink:
+        return sink.append_many(df)
+
+
+def log_stamp() -> tuple[int, int]:
+    """(mtime_ns, size) of the log file — changes whenever the archive does."""
     _ensure_file()
-    written = 0
-    for _, row in df.iterrows():
-        append_log(
-            atm_id                   = str(row.get("atm_id", "")),
-            predicted_issue          = str(row.get("predicted_issue", "")),
-            impact_score             = float(row.get("impact_score", 0)),
-            resolution_mode          = str(row.get("resolution_mode", "")),
-            eligibility_reason       = str(row.get("eligibility_reason", "")),
-            auto_resolution_time_sec = float(row.get("auto_resolution_time_sec", 0)),
-            automation_log           = str(row.get("automation_log", "")),
-        )
-        written += 1
-    return written
+    return tuple(_log_stamp())
 
 
-def load_logs() -> pd.DataFrame:
+def load_logs(columns: list[str] | None = None) -> pd.DataFrame:
     """
     Load all historical log records.
-    Returns a DataFrame with LOG_COLUMNS schema.
+    Returns a DataFrame with LOG_COLUMNS schema (or just `columns`, in
+    LOG_COLUMNS order, when given — unrequested columns are never converted).
     If the file is missing or empty, returns an empty DataFrame with correct columns.
+
+    Parsed once and reused until the file's mtime or size changes; the
+    returned frame is shared between callers, so treat it as read-only.
     """
     _ensure_file()
+    wanted = LOG_COLUMNS if columns is None else [c for c in LOG_COLUMNS if c in columns]
+    st = os.stat(LOG_PATH)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _loaded_logs.get(tuple(wanted))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    df = _read_logs(wanted)
+    _loaded_logs[tuple(wanted)] = (stamp, df)
+    return df
+
+
+_NUMERIC_LOG_COLUMNS = ("impact_score", "auto_resolution_time_sec")
+
+
+def _read_csv_arrow(wanted: list[str]) -> pd.DataFrame | None:
+    """
+    Parse `wanted` columns with pyarrow's threaded reader, or None when pyarrow
+    is missing or rejects the file (the pandas reader then takes over).
+    """
+    if pa_csv is None:
+        return None
+    # Pinned types: text stays text (no timestamp inference), and malformed
+    # numbers fail the whole read over to the lenient pandas path
+    types = {c: pa.float64() if c in _NUMERIC_LOG_COLUMNS else pa.string() for c in wanted}
+    try:
+        table = pa_csv.read_csv(
+            LOG_PATH,
+            # automation_log holds quoted multi-line step traces
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=wanted, column_types=types
+            ),
+        )
+    except (pa.ArrowInvalid, KeyError):
+        return None
+    return table.to_pandas()
+
+
+def _read_logs(wanted: list[str]) -> pd.DataFrame:
+    """Parse the log CSV (only `wanted` columns) and restore column dtypes."""
     try:
-        df = pd.read_csv(LOG_PATH)
+        df = _read_csv_arrow(wanted)
+        if df is None:
+            df = pd.read_csv(LOG_PATH, usecols=wanted)
         if df.empty:
-            return pd.DataFrame(columns=LOG_COLUMNS)
+            return pd.DataFrame(columns=wanted)
         # Ensure numeric columns are typed correctly after CSV round-trip
-        df["impact_score"]             = pd.to_numeric(df["impact_score"],             errors="coerce").fillna(0)
-        df["auto_resolution_time_sec"] = pd.to_numeric(df["auto_resolution_time_sec"], errors="coerce").fillna(0)
+        for col in _NUMERIC_LOG_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        # Three fixed modes → int8 codes, in the pipeline's triage order
+        if "resolution_mode" in df.columns:
+            df["resolution_mode"] = pd.Categorical(
+                df["resolution_mode"], categories=RESOLUTION_MODES, ordered=True
+            )
         return df
     except pd.errors.EmptyDataError:
-        return pd.DataFrame(columns=LOG_COLUMNS)
+        return pd.DataFrame(columns=wanted)
 
 
-def get_log_summary() -> dict:
+def get_log_summary(df: pd.DataFrame | None = None) -> dict:
     """
     Aggregate stats across ALL historical log records.
     Useful for the sidebar and the persistent-log analytics panel.
+
+    Without a frame, a header-only log answers from one stat call and the
+    running totals in SUMMARY_PATH answer in constant time; if they are
+    missing or stale, the two needed columns are scanned once and the
+    totals rebuilt. Pass an already-loaded log frame to
+    aggregate that frame instead.
     """
-    df = load_logs()
-    if df.empty:
-        return {
-            "total_logged":       0,
-            "auto_resolved":      0,
-            "auto_attempted":     0,
-            "manual_required":    0,
-            "avg_auto_time_sec":  0.0,
-        }
+    if df is None:
+        _ensure_file()
+        if os.path.getsize(LOG_PATH) <= _HEADER_BYTES:
+            counters = _count_rows((), ())     # fresh deployment: all zeros
+        else:
+            counters = _read_summary()
+        if counters is None:
+            # Under the lock no append can land between the scan and the stamp
+            with _log_lock():
+                df = load_logs(columns=["resolution_mode", "auto_resolution_time_sec"])
+                counters = _scan_counters(df)
+                _write_summary(counters)
+    else:
+        counters = _scan_counters(df)
 
-    resolved = (df["resolution_mode"] == "AUTO_RESOLVED").sum()
-    attempted = (df["resolution_mode"] == "AUTO_ATTEMPTED").sum()
-    manual    = (df["resolution_mode"] == "MANUAL_REQUIRED").sum()
+    resolved = counters["AUTO_RESOLVED"]
+    return {
+        "total_logged":       int(counters["total"]),
+        "auto_resolved":      int(resolved),
+        "auto_attempted":     int(counters["AUTO_ATTEMPTED"]),
+        "manual_required":    int(counters["MANUAL_REQUIRED"]),
+        "avg_auto_time_sec":  round(counters["resolved_time_sum"] / resolved, 1) if resolved else 0.0,
+    }
 
-    resolved_times = df.loc[df["resolution_mode"] == "AUTO_RESOLVED", "auto_resolution_time_sec"]
-    avg_time = resolved_times.mean() if len(resolved_times) > 0 else 0.0
 
+def _scan_counters(df: pd.DataFrame) -> dict:
+    """Summary counters for a loaded log frame — one grouped pass over the modes."""
+    by_mode = df.groupby("resolution_mode", observed=True, sort=False)[
+        "auto_resolution_time_sec"
+    ].agg(["size", "sum"])
+    counts = by_mode["size"]
     return {
-        "total_logged":       int(len(df)),
-        "auto_resolved":      int(resolved),
-        "auto_attempted":     int(attempted),
-        "manual_required":    int(manual),
-        "avg_auto_time_sec":  round(float(avg_time), 1),
+        "total":             int(len(df)),
+        "AUTO_RESOLVED":     int(counts.get("AUTO_RESOLVED", 0)),
+        "AUTO_ATTEMPTED":    int(counts.get("AUTO_ATTEMPTED", 0)),
+        "MANUAL_REQUIRED":   int(counts.get("MANUAL_REQUIRED", 0)),
+        "resolved_time_sum": float(by_mode["sum"].get("AUTO_RESOLVED", 0.0)),
     }
 
 
@@ -21,20 +21,27 @@ Usage:
 """
 
 import os
+import numpy as np
 import pandas as pd
 
 from data_generator import generate_dataset
 from classifier import train, predict_batch_with_confidence
-from impact_scorer import score_dataframe
-from action_engine import process_dataframe
-from automation_engine import automate_dataframe, compute_automation_metrics
-from log_store import append_logs_from_dataframe
+from impact_scorer import score_dataframe, calculate_impact
+from action_engine import process_dataframe, enrich_incident_inplace
+from automation_engine import (
+    automate_dataframe, compute_automation_metrics, run_automation,
+    RESOLUTION_MODES, REASON_LOW_CONF, LOW_CONF_LOG,
+)
+from log_store import LogSink, append_log
 
 MODEL_PATH = "model/classifier.pkl"
 
 # Predictions below this confidence are too uncertain for automation
 ML_CONFIDENCE_THRESHOLD = 0.60
 
+# Resolution modes in triage order — MANUAL_REQUIRED first, AUTO_RESOLVED last
+RESOLUTION_MODE_DTYPE = pd.CategoricalDtype(list(RESOLUTION_MODES), ordered=True)
+
 # ── Execution mode constants ──────────────────────────────────────────────────
 # Use these strings everywhere — no magic literals scattered through the codebase.
 STABLE_DEMO = "Stable Demo Mode"
@@ -106,7 +113,9 @@ def run_pipeline(
     # No retrain here — avoids double-training in Live Sim mode.
 
     # Layer 1: Classification + confidence scores
-    df = df.copy()
+    # Shallow copy: the raw columns are shared with the caller's frame (which
+    # may be a cached object); only whole columns are ever added or replaced.
+    df = df.copy(deep=False)
     classification = predict_batch_with_confidence(df)
     df["predicted_issue"] = classification["predicted_issue"]
     df["ml_confidence"]   = classification["ml_confidence"]
@@ -118,24 +127,23 @@ def run_pipeline(
     df = process_dataframe(df)
 
     # Layer 5: Automation Engine
-    # deterministic=True  → per-row seed = row index (Stable Demo)
-    # deterministic=False → seed=None, outcomes vary per run (Live Sim)
+    # deterministic=True  → fixed-seed success rolls, same outcomes every run (Stable Demo)
+    # deterministic=False → unseeded rolls, outcomes vary per run (Live Sim)
     df = automate_dataframe(
         df,
         ml_confidence_threshold=confidence_threshold,
         deterministic=(execution_mode == STABLE_DEMO),
     )
 
-    # Layer 6: Persist logs
-    if persist_logs:
-        append_logs_from_dataframe(df)
+    # Layer 6: Persist logs (an empty run has nothing to write)
+    if persist_logs and len(df):
+        with LogSink() as sink:
+            sink.append_many(df)
 
-    # Sort: MANUAL_REQUIRED (highest impact) first, AUTO_RESOLVED last
-    resolution_order = {"MANUAL_REQUIRED": 0, "AUTO_ATTEMPTED": 1, "AUTO_RESOLVED": 2}
-    df["_sort_mode"] = df["resolution_mode"].map(resolution_order).fillna(0)
+    # Sort: MANUAL_REQUIRED (highest impact) first, AUTO_RESOLVED last —
+    # resolution_mode is an ordered categorical in exactly that order
     df = (
-        df.sort_values(["_sort_mode", "impact_score"], ascending=[True, False])
-          .drop(columns=["_sort_mode"])
+        df.sort_values(["resolution_mode", "impact_score"], ascending=[True, False])
           .reset_index(drop=True)
     )
 
@@ -153,21 +161,86 @@ def detect_repeat_atms(df: pd.DataFrame) -> pd.DataFrame:
     Returns a DataFrame of repeat ATMs with their incident counts.
     Used by the dashboard for the repeat-incident warning panel.
     """
-    counts = df["atm_id"].value_counts().reset_index()
-    counts.columns = ["atm_id", "incident_count"]
-    return counts[counts["incident_count"] > 1].sort_values(
-        "incident_count", ascending=False
-    ).reset_index(drop=True)
+    # value_counts() is already sorted by count, descending
+    counts = df["atm_id"].value_counts()
+    counts = counts[counts > 1]
+    return pd.DataFrame({
+        "atm_id":         counts.index.to_numpy(),
+        "incident_count": counts.to_numpy(),
+    })
 
 
-def run_single(incident: dict) -> dict:
+def run_single(
+    incident: dict,
+    confidence_threshold: float = ML_CONFIDENCE_THRESHOLD,
+    persist_logs: bool = False,
+    execution_mode: str = STABLE_DEMO,
+) -> dict:
     """
     Full pipeline for a single incident dict.
     Returns enriched output dict.
+
+    Scalar fast path through the same layers as run_pipeline(): only the
+    classifier sees a (one-row) frame; scoring, actions and automation use
+    their per-incident functions, the log gets one append_log() record, and
+    there is nothing to sort. Outcomes match run_pipeline() on a 1-row frame.
+
+    Unlike run_pipeline(), persist_logs defaults to False: single-incident
+    calls are usually transient (demos, checks), so callers that want the
+    record in data/automation_logs.csv pass persist_logs=True.
     """
-    df_in  = pd.DataFrame([incident])
-    df_out = run_pipeline(df_in)
-    return df_out.iloc[0].to_dict()
+    row = dict(incident)
+
+    # Layer 1: Classification + confidence score
+    classification = predict_batch_with_confidence(pd.DataFrame([row]))
+    row["predicted_issue"] = classification["predicted_issue"].iloc[0]
+    row["ml_confidence"]   = float(classification["ml_confidence"].iloc[0])
+
+    # Layer 2: Impact Scoring
+    row["impact_score"] = calculate_impact(
+        row["transaction_volume"], row["avg_amount"],
+        row["downtime_minutes"], row["complaint_count"],
+    )
+
+    # Layers 3 & 4: Action Recommendation + Escalation
+    enrich_incident_inplace(row)
+
+    # Layer 5: Automation Engine — confidence gate first, as in automate_dataframe
+    conf = row["ml_confidence"]
+    if conf < confidence_threshold:
+        row["resolution_mode"]          = "MANUAL_REQUIRED"
+        row["automation_log"]           = LOW_CONF_LOG.format(conf=conf, threshold=confidence_threshold)
+        row["auto_resolution_time_sec"] = 0
+        row["eligibility_reason"]       = REASON_LOW_CONF.format(conf=conf, threshold=confidence_threshold)
+    else:
+        # First draw of the same generator automate_dataframe uses for row 0
+        roll = np.random.default_rng(0 if execution_mode == STABLE_DEMO else None).random()
+        result = run_automation(
+            predicted_issue   = row["predicted_issue"],
+            impact_score      = row["impact_score"],
+            downtime_minutes  = row["downtime_minutes"],
+            complaint_count   = row["complaint_count"],
+            escalation_status = row["escalation_status"],
+            success_roll      = roll,
+        )
+        row["resolution_mode"]          = result["resolution_mode"]
+        row["automation_log"]           = result["automation_log"]
+        row["auto_resolution_time_sec"] = result["auto_resolution_time_sec"]
+        row["eligibility_reason"]       = result["eligibility_reason"]
+
+    # Layer 6: Persist log
+    if persist_logs:
+        append_log(
+            atm_id                   = str(row.get("atm_id", "")),
+            predicted_issue          = row["predicted_issue"],
+            impact_score             = row["impact_score"],
+            resolution_mode          = row["resolution_mode"],
+            eligibility_reason       = row["eligibility_reason"],
+            auto_resolution_time_sec = row["auto_resolution_time_sec"],
+            automation_log           = row["automation_log"],
+        )
+
+    return row
 
 
 OUTPUT_COLS = [